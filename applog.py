@@ -0,0 +1,163 @@
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+# === APP LOGGING ===
+# Callers only put records on a bounded in-memory queue; a background writer
+# thread formats them, writes them in batches and flushes at most every
+# FLUSH_INTERVAL. logs.txt rotates by size and age, so a runaway error loop
+# can neither stall the translation loop on disk I/O nor fill the disk: when
+# the queue is full new records are dropped and counted instead.
+
+LOG_MAX_BYTES = 1_000_000       # rotate logs.txt after ~1 MB
+LOG_BACKUPS = 3                 # logs.txt.1 .. logs.txt.3 are kept
+LOG_MAX_AGE = 7 * 24 * 3600     # ... or after a week, whichever comes first
+QUEUE_SIZE = 5000
+FLUSH_INTERVAL = 1.0            # seconds
+BATCH_SIZE = 500
+
+logger = logging.getLogger("l2t")
+logger.setLevel(logging.DEBUG)
+logger.propagate = False
+logger.addHandler(logging.NullHandler())
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _BatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    def __init__(self, path, max_bytes, backups, max_age):
+        super().__init__(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8", delay=True)
+        self.max_age = max_age
+        # When logs.txt was started, kept next to it: its mtime is the last write
+        # and a restart would reset the age, and Windows may hand a recreated file
+        # its predecessor's creation time
+        self.started_path = path + ".started"
+        self.opened_at = self._read_started(path)
+        if self.opened_at is None:
+            self._start_now()
+
+    def _read_started(self, path):
+        try:
+            if not os.path.getsize(path):
+                return None
+            with open(self.started_path, encoding="utf-8") as f:
+                return float(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def _start_now(self):
+        self.opened_at = time.time()
+        try:
+            with open(self.started_path, "w", encoding="utf-8") as f:
+                f.write(f"{self.opened_at:.0f}\n")
+        except OSError:
+            pass  # rotation then counts from this run only
+
+    def flush(self):
+        pass  # the writer thread flushes once per batch via flush_batch()
+
+    def flush_batch(self):
+        with self.lock:
+            if self.stream:
+                self.stream.flush()
+
+    def shouldRollover(self, record):
+        if self.max_age and time.time() - self.opened_at >= self.max_age:
+            return 1
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._start_now()
+
+class _LogWriter(threading.Thread):
+    def __init__(self, log_queue, handlers):
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = log_queue
+        self.handlers = handlers
+        self.stopping = False
+
+    def run(self):
+        last_flush = time.monotonic()
+        unflushed = False
+        while True:
+            # Wake up in time for the next due flush
+            wait = FLUSH_INTERVAL - (time.monotonic() - last_flush) if unflushed else FLUSH_INTERVAL
+            try:
+                records = [self.queue.get(timeout=max(0.0, wait))]
+            except queue.Empty:
+                records = []
+            while len(records) < BATCH_SIZE:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            for record in records:
+                if record is None:
+                    self.stopping = True
+                    continue
+                unflushed = True
+                for handler in self.handlers:
+                    if record.levelno >= handler.level:
+                        handler.handle(record)
+            done = self.stopping and self.queue.empty()
+            if unflushed and (done or time.monotonic() - last_flush >= FLUSH_INTERVAL):
+                self.flush()
+                last_flush = time.monotonic()
+                unflushed = False
+            if done:
+                break
+
+    def flush(self):
+        for handler in self.handlers:
+            if isinstance(handler, _BatchedRotatingFileHandler):
+                handler.flush_batch()
+            else:
+                handler.flush()
+
+_queue_handler = None
+_writer = None
+
+def setup_logging(path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS, max_age=LOG_MAX_AGE, console=True):
+    global _queue_handler, _writer
+    formatter = logging.Formatter("[%(asctime)s] %(levelname)-7s %(message)s")
+    handlers = []
+    file_handler = _BatchedRotatingFileHandler(path, max_bytes, backups, max_age)
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    if console and sys.stdout is not None:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    log_queue = queue.Queue(maxsize=QUEUE_SIZE)
+    _queue_handler = _DroppingQueueHandler(log_queue)
+    _writer = _LogWriter(log_queue, handlers)
+    _writer.start()
+    logger.addHandler(_queue_handler)
+
+def shutdown_logging(timeout=2.0):
+    # Writes out whatever is still queued; used right before os._exit()
+    if _writer is None:
+        return
+    try:
+        _queue_handler.queue.put(None, timeout=timeout)
+    except queue.Full:
+        pass
+    _writer.join(timeout)
+    for handler in _writer.handlers:
+        handler.close()
+
+def dropped_records():
+    return _queue_handler.dropped if _queue_handler else 0
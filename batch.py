@@ -0,0 +1,274 @@
+# Headless batch mode: runs recorded chat (a folder of screenshots or a video)
+# through the overlay's OCR + translation pipeline without Tk, the tray or a
+# screen, and streams one JSON line per chat change.
+#
+#   python batch.py raid_screens/ --region 20,600,520,900 --out raid.jsonl
+#   python batch.py raid.mp4 --region general=20,600,520,900 --region trade=540,600,1040,900 --out raid.jsonl
+#   python batch.py raid.mp4 --region 20,600,520,900 --out raid.jsonl --resume
+#
+# Frames are read and change-detected in order in this process; changed
+# regions are OCR'd by a pool of worker processes (one per core by default)
+# and translated here, in frame order, with the same caches as the app.
+# Each record: {"frame", "time" (seconds into the recording), "file" (for
+# screenshots), "region", "text", "translation", "processed_at"[, "error"]}.
+# A frame whose OCR failed gets a record with empty text and the error, and the
+# run goes on. --resume keeps the records already in --out and continues after them.
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from capture import ChangeDetector, ReplaySource, copy_frame
+from chat_parser import ChatParser
+from language import LanguageRouter
+from ocr import (MIN_CONFIDENCE, LineCache, LineFilter, create_engine, load_ocr_profile, ocr_lines,
+                 profile_engine_kwargs, profile_text)
+from pipeline import ChatPipeline, PartialTranslation
+from preprocess import DEFAULT_STEPS, Preprocessor, with_scale
+from translation import TRANSLATION_BACKENDS, create_backend
+from translation_cache import TranslationCache
+from translation_client import TranslationClient
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "translations.db")
+DEFAULT_PROFILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ocr_profile.json")
+QUEUE_PER_WORKER = 4  # frames in flight per OCR worker; bounds memory on long videos
+
+# === OCR WORKERS ===
+
+_worker = {}
+
+def _init_worker(engine_name, engine_kwargs, steps, min_confidence):
+    # An exception here would make the pool respawn workers forever, so it is
+    # kept and raised from the first job instead
+    try:
+        engine = create_engine(engine_name, **engine_kwargs)
+    except Exception as e:
+        _worker["error"] = e
+        return
+    line_filter = LineFilter(min_confidence) if min_confidence >= 0 else None
+    _worker.update(engine=engine, preprocessor=Preprocessor(steps), line_cache=LineCache(), line_filter=line_filter)
+
+def _ocr_job(image):
+    if "error" in _worker:
+        raise RuntimeError(f"OCR engine failed to start in worker: {_worker['error']}")
+    t0 = time.perf_counter()
+    processed = _worker["preprocessor"].run(image)
+    line_filter = _worker["line_filter"]
+    recognize = _worker["engine"].recognize_lines if line_filter else _worker["engine"].recognize
+    text = ocr_lines(processed, recognize, _worker["line_cache"], line_filter=line_filter).strip()
+    return text, time.perf_counter() - t0
+
+# === REGIONS & RESUME ===
+
+def parse_region(spec, index):
+    # "x1,y1,x2,y2" or "name=x1,y1,x2,y2"
+    name, _, box = spec.rpartition("=")
+    try:
+        x1, y1, x2, y2 = (int(v) for v in box.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad region {spec!r}, expected [name=]x1,y1,x2,y2")
+    if x2 <= x1 or y2 <= y1:
+        raise argparse.ArgumentTypeError(f"empty region {spec!r}")
+    return name or f"region{index + 1}", (x1, y1, x2, y2)
+
+def load_resume_state(path):
+    # Returns (frame to restart at, last record per region). Records of the last
+    # frame in the file are dropped and redone, since a run may have stopped
+    # between two regions of that frame; so is a half-written last line.
+    records = []
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+    if not records:
+        return 0, {}
+    restart = records[-1]["frame"]
+    kept = [record for record in records if record["frame"] < restart]
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for record in kept:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+    last = {}
+    for record in kept:
+        if record.get("text"):
+            last[record["region"]] = record
+    return restart, last
+
+# === RUN ===
+
+def make_translate_lines(name, args):
+    if name == "none":
+        return lambda lines: list(lines)
+    backend = create_backend(name, args.src, args.dest, phrase_table=args.phrase_table, url=args.http_url)
+    client = TranslationClient(backend.translate_lines, rate=2.0 if backend.online else None, burst=4)
+    return client.translate_lines
+
+def run(args):
+    source = ReplaySource(args.input, fps=args.fps)
+    total = len(source)
+    regions = args.region or [("frame", None)]
+    cache = None
+    if args.translator != "none" and args.cache:
+        cache = TranslationCache(args.cache)
+        cache.load()
+    translate_lines = make_translate_lines(args.translator, args)
+    router = LanguageRouter()
+    chat_parser = None if args.whole_lines else ChatParser()
+    pipelines = {}
+    detectors = {}
+    last_text = {}
+    for name, bbox in regions:
+        pipelines[name] = ChatPipeline(recognize=None, translate_lines=translate_lines, translation_cache=cache,
+                                       src=args.src, dest=args.dest, router=router,
+                                       chat_parser=chat_parser)
+        pipelines[name].cache_tag = None if args.translator in ("google", "none") else args.translator
+        detectors[name] = ChangeDetector()
+
+    start = 0
+    if args.resume:
+        start, last = load_resume_state(args.out)
+        for name, record in last.items():
+            if name in pipelines:
+                pipelines[name].restore(record["text"], record["translation"])
+                last_text[name] = record["text"]
+        if start:
+            # Prime change detection with the frame before the restart point
+            source.seek(start - 1)
+            full = source.grab()
+            for name, bbox in regions:
+                if full is not None:
+                    detectors[name].changed(full[bbox[1]:bbox[3], bbox[0]:bbox[2]] if bbox else full)
+            source.seek(start)
+        print(f"resuming at frame {start} of {total}", file=sys.stderr)
+
+    profile = load_ocr_profile(args.profile) if args.profile else {}
+    engine_kwargs = dict(profile_engine_kwargs(profile), tesseract_cmd=args.tesseract_cmd)
+    steps = with_scale(DEFAULT_STEPS, profile["scale"]) if "scale" in profile else DEFAULT_STEPS
+    print(profile_text(profile), file=sys.stderr)
+    # Fail here rather than in every worker when no OCR engine is installed
+    create_engine(args.engine, **engine_kwargs).close()
+    out = open(args.out, "a" if args.resume else "w", encoding="utf-8")
+    pool = multiprocessing.Pool(args.workers, initializer=_init_worker,
+                                initargs=(args.engine, engine_kwargs, steps, args.min_confidence))
+    pending = deque()  # (frame, time, file, region, AsyncResult) in frame order
+    stats = {"frames": 0, "ocr_jobs": 0, "records": 0, "ocr_errors": 0, "ocr_seconds": 0.0}
+
+    def write_record(record):
+        record["processed_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        stats["records"] += 1
+    t_start = time.perf_counter()
+
+    def write_next():
+        frame_index, timestamp, file_name, name, result = pending.popleft()
+        record = {"frame": frame_index, "time": round(timestamp, 3), "region": name}
+        if file_name:
+            record["file"] = file_name
+        try:
+            text, seconds = result.get()
+        except Exception as e:
+            # One unreadable frame or crashed Tesseract must not end the run
+            stats["ocr_errors"] += 1
+            write_record(dict(record, text="", translation="", error=f"OCR failed: {e}"))
+            return
+        stats["ocr_seconds"] += seconds
+        pipeline = pipelines[name]
+        if not text or text == last_text.get(name):
+            return
+        last_text[name] = text
+        record["text"] = text
+        try:
+            record["translation"] = pipeline.translate_text(text)
+        except PartialTranslation as e:
+            record["translation"] = e.text
+            record["error"] = str(e.error)
+        write_record(record)
+
+    try:
+        frame_index = start
+        while args.limit is None or frame_index < args.limit:
+            full = source.grab()
+            if full is None:
+                break
+            file_name = os.path.basename(source.paths[source.position - 1]) if source.paths else None
+            for name, bbox in regions:
+                image = full[bbox[1]:bbox[3], bbox[0]:bbox[2]] if bbox else full
+                if not detectors[name].changed(image):
+                    continue
+                pending.append((frame_index, source.timestamp, file_name, name, pool.apply_async(_ocr_job, (copy_frame(image),))))
+                stats["ocr_jobs"] += 1
+            while len(pending) > args.workers * QUEUE_PER_WORKER:
+                write_next()
+            stats["frames"] += 1
+            frame_index += 1
+            if args.progress and frame_index % args.progress == 0:
+                print(f"frame {frame_index}/{total}, {stats['records']} records", file=sys.stderr)
+        while pending:
+            write_next()
+    finally:
+        pool.terminate()
+        out.close()
+        source.close()
+        if cache is not None:
+            cache.close()
+
+    wall = time.perf_counter() - t_start
+    print(f"{stats['frames']} frames, {stats['ocr_jobs']} OCR jobs on {args.workers} workers "
+          f"({stats['ocr_errors']} failed), "
+          f"{stats['records']} records in {wall:.1f}s ({stats['frames'] / wall if wall else 0:.1f} frames/s, "
+          f"{stats['ocr_seconds'] / max(1, stats['ocr_jobs']) * 1000:.0f} ms/OCR job)", file=sys.stderr)
+    print(router.stats_text(), file=sys.stderr)
+    if chat_parser:
+        print(chat_parser.stats_text(), file=sys.stderr)
+    print(source.stats_text(), file=sys.stderr)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Translate recorded L2 chat (screenshot folder or video) to JSONL")
+    parser.add_argument("input", help="folder of screenshots (name order) or a video file (needs opencv-python)")
+    parser.add_argument("--region", action="append", metavar="[NAME=]X1,Y1,X2,Y2",
+                        help="chat region in frame pixels; repeat for several panes (default: whole frame)")
+    parser.add_argument("--out", required=True, help="JSONL output file")
+    parser.add_argument("--resume", action="store_true", help="keep the records already in --out and continue after them")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="OCR worker processes (default: all cores)")
+    parser.add_argument("--engine", default="auto", help="OCR engine: auto, tesserocr or pytesseract")
+    parser.add_argument("--tesseract-cmd", default=None)
+    parser.add_argument("--profile", default=DEFAULT_PROFILE,
+                        help="OCR profile from benchmarks/tune_ocr.py (default: the app's ocr_profile.json, if any; '' for defaults)")
+    parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE,
+                        help="drop OCR'd lines below this Tesseract confidence (0-100) or mostly symbols; -1 keeps every line")
+    parser.add_argument("--translator", default="google", choices=list(TRANSLATION_BACKENDS) + ["none"],
+                        help="translation backend, or none for OCR only")
+    parser.add_argument("--src", default="ru")
+    parser.add_argument("--dest", default="en")
+    parser.add_argument("--whole-lines", action="store_true",
+                        help="translate whole chat lines instead of only the message after 'Name: '")
+    parser.add_argument("--phrase-table", default="phrases.tsv")
+    parser.add_argument("--http-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--cache", default=DEFAULT_CACHE, help="translation cache file shared with the app ('' to disable)")
+    parser.add_argument("--fps", type=float, default=None, help="frame rate for timestamps (screenshot folders default to 1)")
+    parser.add_argument("--limit", type=int, default=None, help="stop before this frame index")
+    parser.add_argument("--progress", type=int, default=500, help="report progress every N frames (0 = quiet)")
+    args = parser.parse_args()
+    try:
+        args.region = [parse_region(spec, i) for i, spec in enumerate(args.region or [])]
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if len({name for name, _ in args.region}) != len(args.region):
+        parser.error("region names must be unique")
+    args.workers = max(1, args.workers)
+    run(args)
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
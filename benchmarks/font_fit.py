@@ -0,0 +1,77 @@
+# Micro-benchmark: auto font fitting with throwaway Tk widgets (the old
+# _get_fitting_font_size) vs. cached font metrics + binary search (TextLayout).
+#
+#   python benchmarks/font_fit.py [--runs 20]
+#
+# Needs a display (on a headless Linux box run it under xvfb-run).
+
+import argparse
+import os
+import sys
+import time
+import tkinter as tk
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from text_layout import TextLayout
+
+SAMPLE_CHAT = "\n".join([
+    "[Trade] Merchant: Selling Blessed Scroll of Enchant Weapon (A), PM me",
+    "Party Leader: Everyone gather at the entrance to the Tower of Insolence",
+    "Clan member: Raid boss spawned near the Cruma Tower, come quickly",
+    "Shout Seller: WTB Dark Crystal Robe Set, paying well in adena",
+    "Alliance: Siege starts in 10 minutes, check your buffs and potions",
+    "Whisper Friend: Are you coming to the raid tonight?",
+] * 2)
+
+def old_fitting_font_size(text, width, height, min_size=8, max_size=32, font_name="Arial"):
+    test_root = tk.Tk()
+    test_root.withdraw()
+    for size in reversed(range(min_size, max_size+1)):
+        font = (font_name, size)
+        label = tk.Label(test_root, text=text, font=font, wraplength=width, justify="left")
+        label.update_idletasks()
+        req_width = label.winfo_reqwidth()
+        req_height = label.winfo_reqheight()
+        label.destroy()
+        if req_width <= width and req_height <= height:
+            test_root.destroy()
+            return size
+    test_root.destroy()
+    return min_size
+
+def timed(fn, runs):
+    samples = []
+    result = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - t0)
+    samples.sort()
+    return result, samples[len(samples) // 2], samples[-1]
+
+def main():
+    parser = argparse.ArgumentParser(description="Time auto font fitting: throwaway Tk widgets vs. cached metrics and binary search")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--width", type=int, default=480)
+    parser.add_argument("--height", type=int, default=260)
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    layout = TextLayout(root)
+    w, h = args.width - 10, args.height - 8
+
+    old_size, old_median, old_max = timed(lambda: old_fitting_font_size(SAMPLE_CHAT, w, h), args.runs)
+    layout.cache.clear()
+    _, cold_median, cold_max = timed(lambda: (layout.cache.clear(), layout.fitting_size(SAMPLE_CHAT, w, h))[1], args.runs)
+    new_size, warm_median, warm_max = timed(lambda: layout.fitting_size(SAMPLE_CHAT, w, h), args.runs)
+
+    print(f"region {args.width}x{args.height}, {len(SAMPLE_CHAT)} chars, {args.runs} runs")
+    print(f"old Tk widgets      : size {old_size:2d}  median {old_median * 1000:8.3f} ms  max {old_max * 1000:8.3f} ms")
+    print(f"TextLayout (uncached): size {new_size:2d}  median {cold_median * 1000:8.3f} ms  max {cold_max * 1000:8.3f} ms")
+    print(f"TextLayout (cached)  : size {new_size:2d}  median {warm_median * 1000:8.3f} ms  max {warm_max * 1000:8.3f} ms")
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Shared pieces for the offline benchmarks: synthetic frame corpora (recorded
+# ones are read by capture.ReplaySource), a stub translator with configurable latency, OCR accuracy
+# metrics and percentile helpers.
+
+import os
+import random
+import sys
+import threading
+import time
+
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# === CORPUS ===
+
+FONT_CANDIDATES = [
+    "arial.ttf",
+    "DejaVuSans.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+]
+
+SENDERS = ["Вася", "Темный_Лорд", "Kira", "МагДня", "Orc_Tank", "Хилка", "Торговец"]
+
+MESSAGES = [
+    "продам заточку на оружие А грейда, пишите в лс",
+    "кто идет на рб через десять минут",
+    "клан ищет активных игроков от 60 уровня",
+    "нужен хил в пати, идем в башню",
+    "куплю кристаллы души дорого",
+    "осада начинается в восемь вечера",
+    "всем привет, как дела",
+    "где найти квест на третью профессию",
+    "продаю сет темного кристалла недорого",
+    "ребята, не забудьте бафы перед рейдом",
+]
+
+COLORS = [(220, 220, 220), (234, 165, 245), (0, 255, 0), (125, 119, 255), (255, 112, 0)]
+
+def load_font(size):
+    for candidate in FONT_CANDIDATES:
+        try:
+            return ImageFont.truetype(candidate, size)
+        except OSError:
+            continue
+    print("warning: no TrueType font with Cyrillic found, synthetic frames will be unreadable", file=sys.stderr)
+    return ImageFont.load_default()
+
+def synthetic_frames(count, size=(420, 260), font_size=14, new_line_chance=0.5, seed=0):
+    # Yields (image, ground truth text) for a scrolling chat: on each frame a new
+    # message arrives with new_line_chance, otherwise only background noise changes.
+    rng = random.Random(seed)
+    font = load_font(font_size)
+    line_height = font_size + 6
+    visible = max(1, (size[1] - 8) // line_height)
+    history = []
+    for _ in range(count):
+        if not history or rng.random() < new_line_chance:
+            text = f"{rng.choice(SENDERS)}: {rng.choice(MESSAGES)}"
+            history.append((text, rng.choice(COLORS)))
+            history = history[-visible:]
+        shade = 28 + rng.randint(-3, 3)
+        image = Image.new("RGB", size, (shade, shade, shade + 10))
+        draw = ImageDraw.Draw(image)
+        for i, (text, color) in enumerate(history):
+            draw.text((6, 4 + i * line_height), text, font=font, fill=color)
+        yield image, "\n".join(text for text, _ in history)
+
+# === STUB TRANSLATOR ===
+
+class StubTranslator:
+    # Stands in for Google: sleeps for latency (± jitter) per request and
+    # returns tagged source lines, so no network is needed.
+    def __init__(self, latency=0.3, jitter=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.lines = 0
+
+    def translate_lines(self, lines):
+        with self.lock:
+            self.requests += 1
+            self.lines += len(lines)
+            delay = self.latency + self.rng.uniform(-self.jitter, self.jitter)
+        time.sleep(max(0.0, delay))
+        return [f"[en] {line}" for line in lines]
+
+# === METRICS ===
+
+def edit_distance(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+def normalize_for_cer(text):
+    return "\n".join(" ".join(line.split()) for line in text.splitlines() if line.strip())
+
+def char_error_rate(truth, text):
+    truth = normalize_for_cer(truth)
+    text = normalize_for_cer(text)
+    if not truth:
+        return 0.0 if not text else 1.0
+    return edit_distance(truth, text) / len(truth)
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": percentile(samples, 50) * 1000,
+        "p95_ms": percentile(samples, 95) * 1000,
+        "p99_ms": percentile(samples, 99) * 1000,
+        "total_s": sum(samples),
+    }
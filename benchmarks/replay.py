@@ -0,0 +1,189 @@
+# Replays chat frames through the same ChatPipeline the overlay uses
+# (change detection → preprocessing → line OCR → cached translation → layout)
+# with a stub translator, and reports per-stage latency percentiles,
+# throughput, CPU time and OCR accuracy.
+#
+#   python benchmarks/replay.py --synthetic 200
+#   python benchmarks/replay.py --frames recorded/ --translator-latency 0.5 --json run.json
+#
+# Runs on a plain Linux box: needs Tesseract, Pillow and NumPy; the layout
+# stage is skipped when no display is available.
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from harness import StubTranslator, char_error_rate, summarize, synthetic_frames
+
+from capture import ChangeDetector, ReplaySource, SyntheticSource
+from ocr import LineCache, LineFilter, OcrPool, create_engine
+from pipeline import ChatPipeline
+from preprocess import DEFAULT_STEPS, Preprocessor
+from scroll import ScrollTracker
+from text_layout import TextLayout, sanitize_text
+from translation_cache import TranslationCache
+
+STAGES = ("capture", "ocr", "translate", "render")
+
+def make_layout():
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        return TextLayout(root)
+    except Exception as e:
+        print(f"note: layout stage measures text cleanup only ({e})", file=sys.stderr)
+        return None
+
+def cpu_times():
+    t = os.times()
+    # children_* covers tesseract.exe subprocesses once they have exited
+    return t.user + t.system + t.children_user + t.children_system
+
+def run(source, pipeline, layout, region_size, bbox=None):
+    timings = {stage: [] for stage in STAGES}
+    errors = []
+    ocr_runs = 0
+    rendered = 0
+    frame_count = 0
+    wall_start = time.perf_counter()
+    cpu_start = cpu_times()
+    while True:
+        t0 = time.perf_counter()
+        image = source.grab(bbox)
+        if image is None:
+            break
+        truth = source.truth
+        frame_count += 1
+        frame = pipeline.capture(image)
+        timings["capture"].append(time.perf_counter() - t0)
+        if frame is None:
+            continue
+        t0 = time.perf_counter()
+        frame = pipeline.ocr(frame)
+        timings["ocr"].append(time.perf_counter() - t0)
+        ocr_runs += 1
+        if frame is None:
+            continue
+        if truth is not None:
+            errors.append(char_error_rate(truth, frame.text))
+        t0 = time.perf_counter()
+        frame = pipeline.translate(frame)
+        timings["translate"].append(time.perf_counter() - t0)
+        if frame is None:
+            continue
+        t0 = time.perf_counter()
+        text = sanitize_text(frame.translated)
+        if layout is not None:
+            layout.fitting_size(text, region_size[0] - 10, region_size[1] - 8)
+        timings["render"].append(time.perf_counter() - t0)
+        rendered += 1
+    wall = time.perf_counter() - wall_start
+    return {
+        "frames": frame_count,
+        "ocr_runs": ocr_runs,
+        "rendered": rendered,
+        "wall_s": wall,
+        "cpu_s": cpu_times() - cpu_start,
+        "throughput_fps": frame_count / wall if wall else 0.0,
+        "ocr_cer_mean": sum(errors) / len(errors) if errors else None,
+        "ocr_cer_frames": len(errors),
+        "capture_source": {"name": source.name, "frames": source.frames, "allocations": source.allocations,
+                           "bytes_allocated": source.bytes_allocated, "grab_s": source.grab_seconds},
+        "stages": {stage: summarize(samples) for stage, samples in timings.items()},
+    }
+
+def print_report(report, translator):
+    print(f"frames {report['frames']}, OCR runs {report['ocr_runs']}, overlay updates {report['rendered']}")
+    print(f"wall {report['wall_s']:.2f}s, CPU {report['cpu_s']:.2f}s, throughput {report['throughput_fps']:.1f} frames/s")
+    if report["ocr_cer_mean"] is not None:
+        print(f"OCR character error rate {report['ocr_cer_mean'] * 100:.2f}% over {report['ocr_cer_frames']} frames")
+    capture = report["capture_source"]
+    if capture["frames"]:
+        print(f"capture ({capture['name']}): {capture['grab_s'] / capture['frames'] * 1000:.2f} ms/grab, "
+              f"{capture['allocations'] / capture['frames']:.2f} allocations/frame")
+    print(f"translator: {translator.requests} requests, {translator.lines} lines")
+    if "scroll" in report:
+        print(report["scroll"])
+    if "ocr_filter" in report:
+        print(report["ocr_filter"])
+    print(f"{'stage':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    for stage in STAGES:
+        s = report["stages"][stage]
+        print(f"{stage:<10}{s['count']:>7}{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['total_s']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay chat frames through the overlay pipeline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--frames", help="directory of captured frames (optional <name>.txt ground truth) or a video file")
+    source.add_argument("--synthetic", type=int, metavar="N", help="generate N synthetic Cyrillic chat frames")
+    parser.add_argument("--size", default="420x260", help="synthetic frame size, WxH")
+    parser.add_argument("--region", help="crop every frame to x1,y1,x2,y2 (default: whole frame)")
+    parser.add_argument("--preload", action="store_true", help="decode recorded frames before timing, so capture cost excludes decoding")
+    parser.add_argument("--scroll", action="store_true", help="OCR only the band exposed by scrolling, as the app does by default")
+    parser.add_argument("--engine", default="auto", help="OCR engine: auto, tesserocr or pytesseract")
+    parser.add_argument("--pool", action="store_true", help="OCR through the supervised worker pool, as the app does")
+    parser.add_argument("--parallel", type=int, default=1, help="with --pool: OCR a full refresh as up to N strip groups at once")
+    parser.add_argument("--tesseract-cmd", default=None)
+    parser.add_argument("--min-confidence", type=float, default=None,
+                        help="drop OCR'd lines below this confidence (0-100) or mostly symbols, as the app does")
+    parser.add_argument("--translator-latency", type=float, default=0.3, help="stub translator seconds per request")
+    parser.add_argument("--translator-jitter", type=float, default=0.0)
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    if args.frames:
+        source = ReplaySource(args.frames, preload=args.preload)
+        if not len(source):
+            parser.error(f"no frames in {args.frames}")
+        width, height = source.frame_size()
+    else:
+        source = SyntheticSource(list(synthetic_frames(args.synthetic, size=(width, height))))
+    bbox = tuple(int(v) for v in args.region.split(",")) if args.region else None
+    if bbox:
+        width, height = bbox[2] - bbox[0], bbox[3] - bbox[1]
+
+    if args.pool:
+        engine = OcrPool(args.engine, size=max(1, args.parallel), tesseract_cmd=args.tesseract_cmd)
+        engine.start()
+    else:
+        engine = create_engine(args.engine, tesseract_cmd=args.tesseract_cmd)
+    translator = StubTranslator(args.translator_latency, args.translator_jitter)
+    cache = TranslationCache(":memory:")
+    cache.load()
+    line_filter = LineFilter(args.min_confidence) if args.min_confidence is not None else None
+    pipeline = ChatPipeline(
+        recognize=engine.recognize_lines if line_filter else engine.recognize,
+        translate_lines=translator.translate_lines,
+        change_detector=ChangeDetector(),
+        preprocessor=Preprocessor(DEFAULT_STEPS),
+        line_cache=LineCache(),
+        translation_cache=cache,
+        scroll_tracker=ScrollTracker() if args.scroll else None,
+        ocr_parallel=max(1, args.parallel) if args.pool else 1,
+        idle_workers=engine.idle_workers if args.pool else None,
+        line_filter=line_filter,
+    )
+    try:
+        report = run(source, pipeline, make_layout(), (width, height), bbox)
+    finally:
+        engine.close()
+        source.close()
+    report["engine"] = engine.name
+    report["translator"] = {"requests": translator.requests, "lines": translator.lines,
+                            "latency_s": args.translator_latency}
+    report["caches"] = {"ocr_lines": pipeline.line_cache.stats_text(), "translations": cache.stats_text()}
+    if pipeline.scroll_tracker:
+        report["scroll"] = pipeline.scroll_tracker.stats_text()
+    if line_filter:
+        report["ocr_filter"] = line_filter.stats_text()
+    print_report(report, translator)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
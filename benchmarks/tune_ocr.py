@@ -0,0 +1,179 @@
+# Finds the fastest Tesseract settings that still read your own chat well:
+# runs a few labeled frames (screenshots with <name>.txt ground truth next to
+# them) through every combination of language model, page segmentation mode,
+# engine mode, character whitelist, dictionary on/off and upscale factor,
+# measures OCR time and character error rate (CER) per frame, and saves the
+# fastest combination under --max-cer as ocr_profile.json, which the overlay
+# and batch.py then use.
+#
+#   python benchmarks/tune_ocr.py --frames labeled/
+#   python benchmarks/tune_ocr.py --frames labeled/ --region 20,600,520,900 --max-cer 0.03 --json tuning.json
+#   python benchmarks/tune_ocr.py --synthetic 10 --dry-run
+#
+# Expect a few minutes: every engine setting is started once and every frame
+# is OCR'd once per combination (--runs times).
+
+import argparse
+import itertools
+import json
+import os
+import string
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from harness import char_error_rate, synthetic_frames
+
+from capture import ReplaySource, copy_frame
+from ocr import (MAX_PROFILE_SCALE, MIN_CONFIDENCE, LineCache, LineFilter, create_engine, ocr_lines, profile_text,
+                 save_ocr_profile)
+from preprocess import DEFAULT_STEPS, Preprocessor, with_scale
+
+DEFAULT_PROFILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ocr_profile.json")
+CHAT_PUNCTUATION = ".,!?:;-+=()[]/%*#@$&'\"_<>"
+
+def load_labeled(path, bbox):
+    source = ReplaySource(path)
+    samples = []
+    while True:
+        image = source.grab(bbox)
+        if image is None:
+            break
+        if source.truth is not None:
+            samples.append((copy_frame(image), source.truth))
+    source.close()
+    return samples
+
+def chat_whitelist(samples):
+    # Every character of the labels plus digits and chat punctuation
+    chars = set("".join(truth for _, truth in samples)) | set(string.digits) | set(CHAT_PUNCTUATION)
+    return "".join(sorted(ch for ch in chars if not ch.isspace()))
+
+def measure(engine, samples, scale, runs, min_confidence):
+    # (median OCR ms per frame including preprocessing, mean CER), read the way
+    # the overlay reads: word confidences and the line filter unless disabled
+    preprocessor = Preprocessor(with_scale(DEFAULT_STEPS, scale))
+    line_filter = LineFilter(min_confidence) if min_confidence >= 0 else None
+    recognize = engine.recognize_lines if line_filter else engine.recognize
+    ocr_lines(preprocessor.run(samples[0][0]), recognize, LineCache(0), line_filter=line_filter)  # warm-up
+    timings = []
+    errors = []
+    for image, truth in samples:
+        best = None
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            # capacity 0: nothing is cached between frames or runs
+            text = ocr_lines(preprocessor.run(image), recognize, LineCache(0), line_filter=line_filter)
+            elapsed = time.perf_counter() - t0
+            best = elapsed if best is None else min(best, elapsed)
+        timings.append(best)
+        errors.append(char_error_rate(truth, text))
+    return float(np.median(timings)) * 1000, sum(errors) / len(errors)
+
+def describe(config):
+    oem = "default" if config["oem"] is None else config["oem"]
+    return (f"{config['lang']:<9} psm {config['psm']:<3} oem {oem:<8} "
+            f"{'whitelist' if config['whitelist'] else '-':<10} {'dict' if config['dictionary'] else 'no dict':<8} "
+            f"x{config['scale']}")
+
+def tune(samples, args):
+    whitelist = chat_whitelist(samples)
+    results = []
+    engine_configs = itertools.product(args.langs, args.psms, args.oems,
+                                       [None, whitelist] if args.whitelist else [None], [True, False] if args.dictionary else [True])
+    for lang, psm, oem, chars, dictionary in engine_configs:
+        config = {"lang": lang, "psm": psm, "oem": oem, "whitelist": chars, "dictionary": dictionary}
+        try:
+            engine = create_engine(args.engine, tesseract_cmd=args.tesseract_cmd, **config)
+        except Exception as e:
+            print(f"{describe(dict(config, scale='*'))}  unavailable: {e}", file=sys.stderr)
+            continue
+        try:
+            for scale in args.scales:
+                try:
+                    ms, cer = measure(engine, samples, scale, args.runs, args.min_confidence)
+                except Exception as e:
+                    print(f"{describe(dict(config, scale=scale))}  failed: {e}", file=sys.stderr)
+                    continue
+                result = dict(config, scale=scale, engine=engine.name, ms_per_frame=round(ms, 2), cer=round(cer, 4))
+                results.append(result)
+                print(f"{describe(result)}  {ms:8.1f} ms/frame  CER {cer * 100:5.2f}%"
+                      f"{'' if cer <= args.max_cer else '  (too inaccurate)'}")
+        finally:
+            engine.close()
+    return results
+
+def parse_list(value, convert=str):
+    return [convert(item.strip()) for item in value.split(",") if item.strip()]
+
+def parse_oem(value):
+    return None if value == "default" else int(value)
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick the fastest accurate Tesseract settings for your chat")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--frames", help="directory of chat screenshots, each with a <name>.txt holding its exact text")
+    source.add_argument("--synthetic", type=int, metavar="N", help="use N synthetic Cyrillic chat frames instead")
+    parser.add_argument("--region", help="crop every frame to x1,y1,x2,y2 (default: whole frame)")
+    parser.add_argument("--engine", default="auto", help="OCR engine: auto, tesserocr or pytesseract")
+    parser.add_argument("--tesseract-cmd", default=None)
+    parser.add_argument("--langs", type=parse_list, default=["rus+eng", "rus"], help="language models to try (default: rus+eng,rus)")
+    parser.add_argument("--psms", type=lambda v: parse_list(v, int), default=[6, 4], help="page segmentation modes (default: 6,4)")
+    parser.add_argument("--oems", type=lambda v: parse_list(v, parse_oem), default=[None, 1],
+                        help="engine modes, 'default' for Tesseract's own (default: default,1)")
+    parser.add_argument("--scales", type=lambda v: parse_list(v, int), default=[1, 2, 3], help="upscale factors (default: 1,2,3)")
+    parser.add_argument("--no-whitelist", dest="whitelist", action="store_false",
+                        help="don't try a whitelist of the characters in the labels")
+    parser.add_argument("--no-dictionary", dest="dictionary", action="store_false",
+                        help="don't try turning Tesseract's dictionaries off")
+    parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE,
+                        help="line filter the overlay uses (OCR_MIN_CONFIDENCE in main.py); -1 measures without it")
+    parser.add_argument("--max-cer", type=float, default=0.05, help="accuracy floor: highest mean character error rate accepted")
+    parser.add_argument("--runs", type=int, default=1, help="time each frame this many times and keep the best")
+    parser.add_argument("--out", default=DEFAULT_PROFILE, help="where to save the profile (default: ocr_profile.json next to main.py)")
+    parser.add_argument("--dry-run", action="store_true", help="only report, don't save a profile")
+    parser.add_argument("--json", help="also write every measured combination to this file")
+    args = parser.parse_args()
+
+    if any(not 1 <= scale <= MAX_PROFILE_SCALE for scale in args.scales):
+        parser.error(f"--scales must be between 1 and {MAX_PROFILE_SCALE}")
+    bbox = tuple(int(v) for v in args.region.split(",")) if args.region else None
+    if args.frames:
+        samples = load_labeled(args.frames, bbox)
+        if not samples:
+            parser.error(f"no frames with a .txt ground truth in {args.frames}")
+    else:
+        samples = [(np.asarray(image), truth) for image, truth in synthetic_frames(args.synthetic)]
+    print(f"{len(samples)} labeled frames", file=sys.stderr)
+
+    results = tune(samples, args)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if not results:
+        print("no combination could be measured; is Tesseract installed with these language models?", file=sys.stderr)
+        return 1
+    accurate = [result for result in results if result["cer"] <= args.max_cer]
+    if not accurate:
+        closest = min(results, key=lambda result: result["cer"])
+        print(f"no combination reached {args.max_cer * 100:.1f}% CER; the best was {closest['cer'] * 100:.2f}% "
+              f"({describe(closest)}). Check the labels or raise --max-cer.", file=sys.stderr)
+        return 1
+    best = min(accurate, key=lambda result: result["ms_per_frame"])
+    default = next((result for result in results if result["lang"] == "rus+eng" and result["psm"] == 6 and result["oem"] is None
+                    and not result["whitelist"] and result["dictionary"] and result["scale"] == 2), None)
+    profile = dict(best, frames=len(samples), max_cer=args.max_cer,
+                   tuned_at=datetime.now(timezone.utc).isoformat(timespec="seconds"))
+    print(profile_text(profile))
+    if default:
+        print(f"default settings: {default['ms_per_frame']:.1f} ms/frame, CER {default['cer'] * 100:.2f}% "
+              f"({default['ms_per_frame'] / best['ms_per_frame']:.1f}x the tuned time)")
+    if not args.dry_run:
+        save_ocr_profile(args.out, profile)
+        print(f"saved {args.out}; restart the overlay to use it")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,382 @@
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageChops
+
+# === CHANGE DETECTION ===
+
+FINGERPRINT_WIDTH = 160   # frames are downsampled to this width before comparing
+PIXEL_TOLERANCE = 24      # grey-level delta ignored per pixel (background shimmer)
+CHANGED_RATIO = 0.002     # share of differing pixels needed to count as a change (cursor blink stays below)
+
+def frame_fingerprint(image, width=FINGERPRINT_WIDTH):
+    if isinstance(image, np.ndarray):
+        return _array_fingerprint(image, width)
+    gray = image.convert("L")
+    w, h = gray.size
+    if w > width:
+        gray = gray.resize((width, max(1, round(h * width / w))), Image.BOX)
+    return gray
+
+def _array_fingerprint(arr, width):
+    # Box-filters an RGB array by a whole factor straight from the (possibly
+    # borrowed) capture buffer; only the small result is allocated
+    h, w = arr.shape[:2]
+    step = max(1, -(-w // width))
+    ystep = max(1, min(step, h))  # strips thinner than a block (probe strips) are one block high
+    gh, gw = h // ystep, w // step
+    blocks = arr[:gh * ystep, :gw * step, :3].reshape(gh, ystep, gw, step, 3)
+    sums = blocks.sum(axis=(1, 3), dtype=np.uint32)
+    gray = (sums[..., 0] * 299 + sums[..., 1] * 587 + sums[..., 2] * 114) // (1000 * ystep * step)
+    return Image.fromarray(gray.astype(np.uint8), "L")
+
+class ChangeDetector:
+    def __init__(self, pixel_tolerance=PIXEL_TOLERANCE, changed_ratio=CHANGED_RATIO):
+        self.pixel_tolerance = pixel_tolerance
+        self.changed_ratio = changed_ratio
+        self.reference = None
+        self.frames_seen = 0
+        self.frames_skipped = 0
+
+    def reset(self):
+        # Forces the next frame to be treated as changed (region reselected, OCR failed, ...)
+        self.reference = None
+
+    def changed(self, image):
+        fingerprint = frame_fingerprint(image)
+        self.frames_seen += 1
+        if self.reference is None or self.reference.size != fingerprint.size:
+            self.reference = fingerprint
+            return True
+        histogram = ImageChops.difference(fingerprint, self.reference).histogram()
+        changed_pixels = sum(histogram[self.pixel_tolerance + 1:])
+        w, h = fingerprint.size
+        if changed_pixels <= self.changed_ratio * w * h:
+            # Keep the old reference so slow drift still adds up to a change eventually
+            self.frames_skipped += 1
+            return False
+        self.reference = fingerprint
+        return True
+
+# === CAPTURE SOURCES ===
+# grab(bbox) returns the (x1, y1, x2, y2) box as an H x W x 3 RGB uint8 NumPy
+# array, or the whole screen/frame for bbox=None, or None once a recording has
+# run out. Sources may return a view into a buffer they reuse: it is only valid
+# until the next grab(), so take copy_frame() before handing it to another
+# thread. Allocations and grab time are counted per source.
+
+IMAGE_EXTENSIONS = (".png", ".bmp", ".jpg", ".jpeg")
+
+def copy_frame(image):
+    # Owned, contiguous copy of a grabbed frame (PIL images are left as they are)
+    if isinstance(image, np.ndarray):
+        return np.array(image, order="C")
+    return image
+
+def crop_box(bbox, width, height):
+    if bbox is None:
+        return 0, 0, width, height
+    x1, y1, x2, y2 = bbox
+    x1, x2 = max(0, min(x1, width)), max(0, min(x2, width))
+    y1, y2 = max(0, min(y1, height)), max(0, min(y2, height))
+    return x1, y1, max(x1, x2), max(y1, y2)
+
+class CaptureSource:
+    name = "base"
+
+    def __init__(self):
+        self.frames = 0
+        self.allocations = 0       # frame-sized buffers allocated
+        self.bytes_allocated = 0
+        self.grab_seconds = 0.0
+        self.truth = None          # ground-truth text of the last frame, if the source has it
+        self.timestamp = None      # seconds into a recording of the last frame
+
+    def grab(self, bbox=None):
+        t0 = time.perf_counter()
+        frame = self._grab(bbox)
+        self.grab_seconds += time.perf_counter() - t0
+        if frame is not None:
+            self.frames += 1
+        return frame
+
+    def _grab(self, bbox):
+        raise NotImplementedError
+
+    def _allocated(self, nbytes, count=1):
+        self.allocations += count
+        self.bytes_allocated += nbytes
+
+    def close(self):
+        pass
+
+    def stats_text(self):
+        if not self.frames:
+            return f"Capture ({self.name}): no frames yet"
+        return (f"Capture ({self.name}): {self.frames} frames, {self.grab_seconds / self.frames * 1000:.2f} ms/grab, "
+                f"{self.allocations / self.frames:.2f} allocations/frame "
+                f"({self.bytes_allocated / self.frames / 1024:.0f} KB/frame)")
+
+class ImageGrabSource(CaptureSource):
+    # PIL.ImageGrab: a new bitmap plus a new array on every grab
+    name = "imagegrab"
+
+    def _grab(self, bbox):
+        from PIL import ImageGrab
+        image = ImageGrab.grab(bbox=bbox)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        arr = np.asarray(image)
+        self._allocated(2 * arr.nbytes, count=2)
+        return arr
+
+class GdiSource(CaptureSource):
+    # Windows only: BitBlt from the screen into a DIB section that stays selected
+    # into a memory DC. The DIB's pixels are exposed as a NumPy view (BGRA, read
+    # as RGB through a reversed-channel view), so a grab allocates nothing unless
+    # the box size changes. Like ImageGrab, layered windows (the overlay) are left
+    # out because CAPTUREBLT isn't used.
+    name = "gdi"
+    SRCCOPY = 0x00CC0020
+
+    def __init__(self):
+        super().__init__()
+        if sys.platform != "win32":
+            raise RuntimeError("GDI capture is only available on Windows")
+        import ctypes
+        from ctypes import wintypes
+        self.ctypes = ctypes
+        self.user32 = ctypes.WinDLL("user32", use_last_error=True)
+        self.gdi32 = ctypes.WinDLL("gdi32", use_last_error=True)
+        self.user32.GetDC.restype = wintypes.HDC
+        self.user32.GetDC.argtypes = [wintypes.HWND]
+        self.user32.ReleaseDC.argtypes = [wintypes.HWND, wintypes.HDC]
+        self.gdi32.CreateCompatibleDC.restype = wintypes.HDC
+        self.gdi32.CreateCompatibleDC.argtypes = [wintypes.HDC]
+        self.gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+        self.gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.c_void_p, wintypes.UINT,
+                                                ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+        self.gdi32.SelectObject.restype = wintypes.HGDIOBJ
+        self.gdi32.SelectObject.argtypes = [wintypes.HDC, wintypes.HGDIOBJ]
+        self.gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+        self.gdi32.DeleteDC.argtypes = [wintypes.HDC]
+        self.gdi32.BitBlt.argtypes = [wintypes.HDC, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+                                      wintypes.HDC, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+
+        class BITMAPINFOHEADER(ctypes.Structure):
+            _fields_ = [("biSize", wintypes.DWORD), ("biWidth", wintypes.LONG), ("biHeight", wintypes.LONG),
+                        ("biPlanes", wintypes.WORD), ("biBitCount", wintypes.WORD),
+                        ("biCompression", wintypes.DWORD), ("biSizeImage", wintypes.DWORD),
+                        ("biXPelsPerMeter", wintypes.LONG), ("biYPelsPerMeter", wintypes.LONG),
+                        ("biClrUsed", wintypes.DWORD), ("biClrImportant", wintypes.DWORD)]
+        self.BITMAPINFOHEADER = BITMAPINFOHEADER
+        self.screen_dc = self.user32.GetDC(None)
+        self.mem_dc = self.gdi32.CreateCompatibleDC(self.screen_dc)
+        self.bitmap = None
+        self.size = None
+        self.rgb = None
+
+    def _ensure_buffer(self, width, height):
+        if self.size == (width, height):
+            return
+        ctypes = self.ctypes
+        header = self.BITMAPINFOHEADER()
+        header.biSize = ctypes.sizeof(header)
+        header.biWidth = width
+        header.biHeight = -height  # top-down rows, like a NumPy array
+        header.biPlanes = 1
+        header.biBitCount = 32
+        bits = ctypes.c_void_p()
+        bitmap = self.gdi32.CreateDIBSection(self.mem_dc, ctypes.byref(header), 0, ctypes.byref(bits), None, 0)
+        if not bitmap:
+            raise OSError(f"CreateDIBSection failed ({ctypes.get_last_error()})")
+        self.gdi32.SelectObject(self.mem_dc, bitmap)
+        if self.bitmap:
+            self.gdi32.DeleteObject(self.bitmap)
+        self.bitmap = bitmap
+        self.size = (width, height)
+        pixels = (ctypes.c_ubyte * (width * height * 4)).from_address(bits.value)
+        bgra = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4)
+        self.rgb = bgra[:, :, 2::-1]
+        self._allocated(width * height * 4)
+
+    def _grab(self, bbox):
+        if bbox is None:
+            bbox = (0, 0, self.user32.GetSystemMetrics(0), self.user32.GetSystemMetrics(1))  # primary screen
+        x1, y1, x2, y2 = bbox
+        width, height = max(1, x2 - x1), max(1, y2 - y1)
+        self._ensure_buffer(width, height)
+        if not self.gdi32.BitBlt(self.mem_dc, 0, 0, width, height, self.screen_dc, x1, y1, self.SRCCOPY):
+            raise OSError(f"BitBlt failed ({self.ctypes.get_last_error()})")
+        self.gdi32.GdiFlush()
+        return self.rgb
+
+    def close(self):
+        if self.bitmap:
+            self.gdi32.DeleteObject(self.bitmap)
+            self.bitmap = None
+        if self.mem_dc:
+            self.gdi32.DeleteDC(self.mem_dc)
+            self.mem_dc = None
+        if self.screen_dc:
+            self.user32.ReleaseDC(None, self.screen_dc)
+            self.screen_dc = None
+        self.size = None
+
+class ReplaySource(CaptureSource):
+    # Recorded frames: a directory of screenshots (name order, optional <name>.txt
+    # ground truth next to each) or a video file (needs OpenCV). bbox crops each
+    # frame as a view; with preload=True the whole recording is decoded up front so
+    # grabs cost no decoding or allocation.
+    name = "replay"
+
+    def __init__(self, path, loop=False, preload=False, fps=None):
+        super().__init__()
+        self.path = path
+        self.loop = loop
+        self.position = 0
+        self.video = None
+        self.buffer = None
+        self.frame_cache = None
+        if os.path.isdir(path):
+            self.paths = [os.path.join(path, name) for name in sorted(os.listdir(path))
+                          if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS]
+            self.fps = fps or 1.0
+            if preload:
+                self.frame_cache = [self._read_image(i) for i in range(len(self.paths))]
+        else:
+            self.paths = None
+            try:
+                import cv2
+            except ImportError:
+                raise RuntimeError("Replaying a video needs OpenCV (pip install opencv-python)")
+            self.cv2 = cv2
+            self.video = cv2.VideoCapture(path)
+            if not self.video.isOpened():
+                raise RuntimeError(f"Could not open video: {path}")
+            self.fps = fps or self.video.get(cv2.CAP_PROP_FPS) or 30.0
+            if preload:
+                self.frame_cache = []
+                while True:
+                    frame = self._read_video()
+                    if frame is None:
+                        break
+                    self.frame_cache.append((frame.copy(), None))
+                    self._allocated(frame.nbytes)
+                self.video.release()
+                self.video = None
+
+    def __len__(self):
+        if self.frame_cache is not None:
+            return len(self.frame_cache)
+        if self.paths is not None:
+            return len(self.paths)
+        return int(self.video.get(self.cv2.CAP_PROP_FRAME_COUNT))
+
+    def frame_size(self):
+        if self.frame_cache:
+            height, width = self.frame_cache[0][0].shape[:2]
+            return width, height
+        if self.paths is not None:
+            with Image.open(self.paths[0]) as image:  # reads the header only
+                return image.size
+        return (int(self.video.get(self.cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.video.get(self.cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def _read_image(self, index):
+        path = self.paths[index]
+        with Image.open(path) as image:
+            arr = np.asarray(image.convert("RGB"))
+        self._allocated(arr.nbytes)
+        truth = None
+        truth_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(truth_path):
+            with open(truth_path, encoding="utf-8") as f:
+                truth = f.read().strip()
+        return arr, truth
+
+    def _read_video(self):
+        # Decodes into the same BGR buffer every time; returned as an RGB view
+        ok, frame = self.video.read(self.buffer)
+        if not ok:
+            return None
+        if self.buffer is None or frame is not self.buffer:
+            self.buffer = frame
+            self._allocated(frame.nbytes)
+        return frame[:, :, ::-1]
+
+    def seek(self, position):
+        self.position = position
+        if self.video is not None:
+            self.video.set(self.cv2.CAP_PROP_POS_FRAMES, position)
+
+    def _next(self):
+        if self.frame_cache is not None:
+            if self.position >= len(self.frame_cache):
+                return None, None
+            return self.frame_cache[self.position]
+        if self.paths is not None:
+            if self.position >= len(self.paths):
+                return None, None
+            return self._read_image(self.position)
+        return self._read_video(), None
+
+    def _grab(self, bbox):
+        frame, truth = self._next()
+        if frame is None and self.loop and self.position > 0:
+            self.seek(0)
+            frame, truth = self._next()
+        if frame is None:
+            return None
+        self.timestamp = self.position / self.fps
+        self.truth = truth
+        self.position += 1
+        x1, y1, x2, y2 = crop_box(bbox, frame.shape[1], frame.shape[0])
+        return frame[y1:y2, x1:x2]
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+            self.video = None
+
+class SyntheticSource(CaptureSource):
+    # Frames generated in memory, e.g. benchmarks/harness.synthetic_frames: an
+    # iterable of PIL images or (image, ground truth) pairs
+    name = "synthetic"
+
+    def __init__(self, frames, fps=1.0):
+        super().__init__()
+        self.frame_iter = iter(frames)
+        self.fps = fps
+        self.position = 0
+
+    def _grab(self, bbox):
+        item = next(self.frame_iter, None)
+        if item is None:
+            return None
+        image, truth = item if isinstance(item, tuple) else (item, None)
+        if isinstance(image, Image.Image):
+            image = np.asarray(image.convert("RGB"))
+            self._allocated(image.nbytes)
+        self.truth = truth
+        self.timestamp = self.position / self.fps
+        self.position += 1
+        x1, y1, x2, y2 = crop_box(bbox, image.shape[1], image.shape[0])
+        return image[y1:y2, x1:x2]
+
+CAPTURE_SOURCES = {source.name: source for source in (GdiSource, ImageGrabSource, ReplaySource, SyntheticSource)}
+
+def create_capture_source(name="auto", **options):
+    # "auto": the buffer-reusing GDI grabber on Windows, ImageGrab elsewhere
+    if name == "auto":
+        if sys.platform == "win32":
+            try:
+                return GdiSource()
+            except Exception:
+                pass
+        return ImageGrabSource()
+    if name not in CAPTURE_SOURCES:
+        raise ValueError(f"Unknown capture source: {name}")
+    return CAPTURE_SOURCES[name](**options)
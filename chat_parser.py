@@ -0,0 +1,102 @@
+import re
+import threading
+from collections import OrderedDict
+
+# === CHAT LINE PARSER ===
+# Splits an OCR'd Lineage 2 chat line into channel, sender and message body so
+# only the body is translated: player names aren't mangled by the translator,
+# fewer characters are sent, and "WTS DC 100kk" from two different players is
+# one translation cache entry. Lines without a "Name: " header (system
+# messages, wrapped continuation lines) are all body.
+#
+# A "Word: " header only counts as a sender after a channel mark or [Tag], or
+# when that name was already seen as a sender on such a line: otherwise
+# "Цена: 100кк" or "Внимание: ..." would lose their first word to the header.
+# A general-chat player who never wrote in a marked channel is therefore
+# translated with the name, until they do.
+
+CHANNEL_PREFIXES = {
+    # prefix the client puts in front of the sender: channel
+    "!": "shout",
+    "+": "trade",
+    "#": "party",
+    "@": "clan",
+    "$": "alliance",
+    "%": "hero",
+    "->": "whisper",
+}
+MAX_SENDERS = 2048     # names remembered in the interned sender table
+
+_LINE_RE = re.compile(
+    r"^(?P<head>\s*"
+    r"(?:\[(?P<tag>[^\]]{1,16})\]\s*|(?P<prefix>->|[!+#@$%]))?"
+    r"(?P<sender>[^\s:\[\]]{1,16})\s?:\s+)"  # L2 character names are at most 16 characters
+    r"(?P<body>\S.*)$"
+)
+
+class ChatLine:
+    __slots__ = ("head", "channel", "sender", "body")
+
+    def __init__(self, head, channel, sender, body):
+        self.head = head        # the original text before the body ("+John: "), "" when there is no sender
+        self.channel = channel  # "trade", "party", ... or a bracketed tag; None for plain/general lines
+        self.sender = sender
+        self.body = body
+
+    def join(self, body):
+        return self.head + body
+
+class SenderTable:
+    # Bounded table of sender names, most recently seen last. Repeated names
+    # share one string object, and a full table forgets the least recent name.
+    def __init__(self, maxsize=MAX_SENDERS):
+        self.maxsize = maxsize
+        self.names = OrderedDict()
+        self.hits = 0
+        self.evictions = 0
+
+    def intern(self, name):
+        known = self.names.get(name)
+        if known is not None:
+            self.names.move_to_end(name)
+            self.hits += 1
+            return known
+        self.names[name] = name
+        if len(self.names) > self.maxsize:
+            self.names.popitem(last=False)
+            self.evictions += 1
+        return name
+
+    def __len__(self):
+        return len(self.names)
+
+class ChatParser:
+    # Shared by all pipelines
+    def __init__(self, max_senders=MAX_SENDERS):
+        self.lock = threading.Lock()
+        self.senders = SenderTable(max_senders)
+        self.lines = 0
+        self.with_sender = 0
+        self.chars_skipped = 0  # header characters not sent to the translator
+
+    def parse(self, line):
+        match = _LINE_RE.match(line)
+        with self.lock:
+            self.lines += 1
+            if not match or not (match.group("tag") or match.group("prefix")
+                                 or match.group("sender") in self.senders.names):
+                return ChatLine("", None, None, line)
+            self.with_sender += 1
+            self.chars_skipped += len(match.group("head"))
+            sender = self.senders.intern(match.group("sender"))
+        tag, prefix = match.group("tag"), match.group("prefix")
+        channel = tag if tag else CHANNEL_PREFIXES.get(prefix)
+        return ChatLine(match.group("head"), channel, sender, match.group("body"))
+
+    def parse_lines(self, lines):
+        return [self.parse(line) for line in lines]
+
+    def stats_text(self):
+        return (f"Chat parser: {self.with_sender} of {self.lines} lines had a sender, "
+                f"{self.chars_skipped} header chars not translated, "
+                f"{len(self.senders)} senders known ({self.senders.hits} repeats, {self.senders.evictions} evicted)")
@@ -0,0 +1,94 @@
+import threading
+import unicodedata
+
+# === LINE LANGUAGE ROUTING ===
+# Decides per OCR'd line whether it goes to the translator. Each language is
+# tied to its script, and a line is judged by the share of its letters in the
+# source language's script: enough of them and it is translated; lines in the
+# target language's script, numbers (prices, coordinates) and blank lines pass
+# through unchanged; OCR noise (mostly symbols, too few letters) is dropped.
+# When source and target share a script the ratio can't tell them apart, so
+# every line with letters is translated.
+
+LANGUAGES = {
+    # code: (label, script)
+    "ru": ("Russian", "CYRILLIC"),
+    "uk": ("Ukrainian", "CYRILLIC"),
+    "be": ("Belarusian", "CYRILLIC"),
+    "bg": ("Bulgarian", "CYRILLIC"),
+    "en": ("English", "LATIN"),
+    "de": ("German", "LATIN"),
+    "fr": ("French", "LATIN"),
+    "es": ("Spanish", "LATIN"),
+    "pt": ("Portuguese", "LATIN"),
+    "pl": ("Polish", "LATIN"),
+    "ro": ("Romanian", "LATIN"),
+    "tr": ("Turkish", "LATIN"),
+    "el": ("Greek", "GREEK"),
+    "ko": ("Korean", "HANGUL"),
+}
+
+SOURCE_RATIO = 0.3       # share of letters in the source script that makes a line translatable
+MIN_SIGNAL_RATIO = 0.4   # below this share of letters/digits among non-space characters a line is noise
+MIN_LETTERS = 2          # lines with letters but fewer than this (and no digits) are noise
+
+TRANSLATE, KEEP, DROP = "translate", "keep", "drop"
+
+_script_cache = {}
+
+def char_script(ch):
+    # First word of the Unicode name ("CYRILLIC SMALL LETTER A" → CYRILLIC)
+    script = _script_cache.get(ch)
+    if script is None:
+        name = unicodedata.name(ch, "")
+        script = name.split(" ", 1)[0] if name else ""
+        if len(_script_cache) < 10000:
+            _script_cache[ch] = script
+    return script
+
+def language_script(code):
+    return LANGUAGES[code][1] if code in LANGUAGES else None
+
+def is_noise(line):
+    # Mostly symbols (|_ ,.~), or a letter or two on their own
+    text = "".join(line.split())
+    letters = sum(1 for ch in text if ch.isalpha())
+    digits = sum(1 for ch in text if ch.isdigit())
+    if (letters + digits) < MIN_SIGNAL_RATIO * len(text):
+        return True
+    return 0 < letters < MIN_LETTERS and not digits
+
+def classify_line(line, src="ru", dest="en"):
+    text = "".join(line.split())
+    if not text:
+        return KEEP
+    if is_noise(text):
+        return DROP
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return KEEP  # numbers, prices, coordinates
+    src_script = language_script(src)
+    dest_script = language_script(dest)
+    if src_script is None or src_script == dest_script:
+        return TRANSLATE
+    in_src = sum(1 for ch in letters if char_script(ch) == src_script)
+    if in_src >= SOURCE_RATIO * len(letters):
+        return TRANSLATE
+    return KEEP
+
+class LanguageRouter:
+    # Shared by all pipelines; only keeps counts
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {TRANSLATE: 0, KEEP: 0, DROP: 0}
+
+    def route(self, lines, src, dest):
+        routes = [classify_line(line, src, dest) for line in lines]
+        with self.lock:
+            for route in routes:
+                self.counts[route] += 1
+        return routes
+
+    def stats_text(self):
+        return (f"Line routing: {self.counts[TRANSLATE]} translated, "
+                f"{self.counts[KEEP]} passed through, {self.counts[DROP]} dropped as noise")
@@ -0,0 +1,99 @@
+import re
+
+# === LINE DIFF ===
+# Aligns the lines of the current OCR frame against the previous frame's
+# lines so OCR jitter (о/o, a stray |) and scrolling don't count as new
+# content. Lines that match a previous line within a small edit distance keep
+# that line's translation; only unmatched lines are sent for translation.
+# Numbers must match exactly: "продам меч за 150кк" is a new message, not
+# jitter of "...за 100кк".
+
+_DIGITS_RE = re.compile(r"\d+")
+
+MAX_EDIT_RATIO = 0.15  # allowed edits per character; lines shorter than 1/ratio must match exactly
+
+def bounded_edit_distance(a, b, limit):
+    # Levenshtein distance restricted to a diagonal band of width limit; returns
+    # limit + 1 as soon as the distance is known to exceed limit
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    if a == b:
+        return 0
+    big = limit + 1
+    n = len(b)
+    previous = [j if j <= limit else big for j in range(n + 1)]
+    for i in range(1, len(a) + 1):
+        low = max(1, i - limit)
+        high = min(n, i + limit)
+        current = [big] * (n + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        ca = a[i - 1]
+        for j in range(low, high + 1):
+            value = min(previous[j - 1] + (ca != b[j - 1]), previous[j] + 1, current[j - 1] + 1, big)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > limit:
+            return big
+        previous = current
+    return previous[n]
+
+def lines_match(a, b, max_ratio=MAX_EDIT_RATIO):
+    a = " ".join(a.split())
+    b = " ".join(b.split())
+    if a == b:
+        return True
+    if _DIGITS_RE.findall(a) != _DIGITS_RE.findall(b):
+        return False
+    limit = int(max(len(a), len(b)) * max_ratio)
+    return limit > 0 and bounded_edit_distance(a, b, limit) <= limit
+
+class LineDiffer:
+    def __init__(self, max_ratio=MAX_EDIT_RATIO):
+        self.max_ratio = max_ratio
+        self.previous = []  # [(source line, translation)] of the last frame
+        self.reused = 0
+        self.new = 0
+
+    def reset(self):
+        self.previous = []
+
+    def align(self, lines):
+        # Returns, per current line, the index of the matching previous line or None.
+        # Chat scrolls up, so only the offset k where lines[i] ~ previous[i + k]
+        # for the most lines is used; a line off that offset is new even if it
+        # resembles some older line.
+        prev = [source for source, _ in self.previous]
+        matches = [None] * len(lines)
+        if not prev:
+            return matches
+        best_pairs = []
+        for offset in range(-len(lines) + 1, len(prev)):
+            pairs = [(i, i + offset) for i in range(len(lines))
+                     if 0 <= i + offset < len(prev) and lines_match(lines[i], prev[i + offset], self.max_ratio)]
+            if len(pairs) > len(best_pairs):
+                best_pairs = pairs
+            if len(best_pairs) == len(lines):
+                break
+        for i, j in best_pairs:
+            matches[i] = j
+        return matches
+
+    def carry_over(self, lines, fixed=None):
+        # Previous translations for matched lines, None for genuinely new ones.
+        # Lines flagged in fixed (passed through untranslated) are never carried over.
+        matches = self.align(lines)
+        carried = [self.previous[j][1] if j is not None and not (fixed and fixed[i]) else None
+                   for i, j in enumerate(matches)]
+        reused = sum(1 for t in carried if t is not None)
+        self.reused += reused
+        self.new += len(lines) - reused - (sum(1 for f in fixed if f) if fixed else 0)
+        return carried
+
+    def remember(self, lines, translations):
+        self.previous = list(zip(lines, translations))
+
+    def stats_text(self):
+        return f"Line diff: {self.reused} lines kept their translation, {self.new} new"
@@ -1,39 +1,46 @@
-import pytesseract
-from PIL import ImageGrab, Image, ImageTk, ImageDraw, ImageFont
-from googletrans import Translator
+from PIL import Image, ImageTk, ImageDraw, ImageFont
 import threading
 import time
-import hashlib
 import win32gui
 import win32con
 import tkinter as tk
+from tkinter import filedialog, simpledialog
 import pystray
 import os
 import sys
 import ctypes
 import traceback
-from datetime import datetime
-import concurrent.futures
+import multiprocessing
+from capture import ChangeDetector, create_capture_source
+from ocr import (LineCache, LineFilter, OcrPool, OcrTimeout, engine_benchmark_text, load_ocr_profile,
+                 profile_engine_kwargs, profile_text)
+from translation_cache import TranslationCache
+from pipeline import ChatPipeline, FairQueue, PartialTranslation, Stage
+from regions import ChatRegion, unique_region_name
+from text_layout import TextLayout, sanitize_text
+from scheduler import ScanScheduler
+from preprocess import DEFAULT_STEPS, Preprocessor, with_scale
+from metrics import metrics
+from translation import TRANSLATION_BACKENDS, create_backend
+from chat_parser import ChatParser
+from scroll import ScrollTracker
+from language import LANGUAGES, LanguageRouter
+from translation_client import CircuitOpen, TranslationClient
+from applog import dropped_records, logger, setup_logging, shutdown_logging
 
 # === LOGGING ===
 
+LOG_FILE = os.path.join(os.path.dirname(sys.argv[0]), "logs.txt")
 last_error = ""
 
+# Both only enqueue the record; applog's writer thread does the file I/O
 def log_action(message):
-    log_error("[ACTION] " + message)
+    logger.info(message.strip())
 
 def log_error(message):
     global last_error
     last_error = message
-    ts = f"[{datetime.now()}] "
-    msg = ts + message.strip()
-    print("Logging:", msg)
-    try:
-        log_file = os.path.join(os.path.dirname(sys.argv[0]), "logs.txt")
-        with open(log_file, "a", encoding="utf-8") as f:
-            f.write(msg + "\n")
-    except Exception:
-        pass
+    logger.error(message.strip())
 
 def handle_exception(exc_type, exc_value, exc_traceback):
     if issubclass(exc_type, KeyboardInterrupt):
@@ -45,16 +52,49 @@ sys.excepthook = handle_exception
 
 # === CONFIG ===
 
-pytesseract.pytesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+TESSERACT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+CAPTURE_SOURCE = "auto"  # "auto"/"gdi" (reuses one buffer per region), "imagegrab", or "replay" to read CAPTURE_REPLAY_PATH
+CAPTURE_REPLAY_PATH = None  # folder of screenshots or a video, replayed in a loop instead of the screen
+OCR_ENGINE = "auto"  # "auto", "tesserocr" (in-process, optional) or "pytesseract"
+OCR_PROFILE_FILE = os.path.join(os.path.dirname(sys.argv[0]), "ocr_profile.json")  # written by benchmarks/tune_ocr.py
+OCR_TIMEOUT = 3  # seconds before a stuck OCR worker process is killed and replaced
+OCR_WAIT_TIMEOUT = 10  # seconds an OCR job waits for a free worker process before the frame is skipped
+OCR_WORKERS = 2  # frames OCR'd at once, shared by all chat regions
+OCR_PARALLEL = 4  # a full refresh (first frame, reselect, big scroll) is split into up to this many strip groups OCR'd at once; 1 = off
+# OCR worker processes: enough for the parallel strips, but one core is left to the game
+OCR_POOL_SIZE = max(OCR_WORKERS, min(OCR_PARALLEL, (os.cpu_count() or 2) - 1))
+OCR_MIN_CONFIDENCE = 60  # OCR'd lines Tesseract is less sure of (0-100) are dropped as noise; None keeps every line
+SCROLL_BAND_OCR = True  # after the chat scrolls, OCR only the newly exposed lines instead of the whole region
+TRANSLATE_WORKERS = 2  # frames (from any region) being translated at once
+DEFAULT_REGION_NAME = "Chat"
+# Image cleanup before OCR, see preprocess.py. Swap ("grayscale"/"threshold") for
+# ("color_mask", {"channels": ["general", "trade"]}) to read only some chat colours.
+PREPROCESS_STEPS = DEFAULT_STEPS
+SRC_LANG = "ru"   # chat language; any code in language.LANGUAGES (changeable from the Languages menu)
+DEST_LANG = "en"  # language the overlay shows
+PARSE_CHAT_LINES = True  # translate only the message after "Name: ", keeping channel and sender as they are
+TRANSLATOR_BACKEND = "google"  # "google", "argos" (offline model), "phrases" (offline table) or "http"
+PHRASE_TABLE_FILE = os.path.join(os.path.dirname(sys.argv[0]), "phrases.tsv")
+HTTP_TRANSLATE_URL = "http://127.0.0.1:5000"  # LibreTranslate-compatible server
+TRANSLATE_RATE = 2.0        # online translators: sustained requests per second...
+TRANSLATE_BURST = 4         # ...with this many allowed back to back
+TRANSLATE_CONCURRENCY = 2   # batches in flight at once
+TRANSLATE_RETRIES = 3       # retries per batch, with jittered exponential backoff
+BREAKER_FAILURES = 5        # consecutive failures that pause the translator...
+BREAKER_RESET = 30          # ...for this many seconds (cached lines are still shown)
 SCAN_INTERVALS = [1, 2, 5, 10, 30]
 scan_interval_idx = 3  # default to 5s
+scan_adaptive = False  # picked from the tray: new regions start adaptive too
+ADAPTIVE_MIN_INTERVAL = 0.5  # adaptive scan: fastest rate while messages arrive
+ADAPTIVE_MAX_INTERVAL = 10   # adaptive scan: slowest rate when the chat is idle
+PROBE_HEIGHT = 24            # px at the bottom of the region checked between adaptive scans
 
 HELP_TEXT = """
 L2 Chat Overlay Translator – Help
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 FEATURES
-• Translates your Lineage 2 chat (Russian → English) and overlays result in-place.
+• Translates your Lineage 2 chat (Russian → English by default) and overlays result in-place.
 • Overlay header is always visible, always clickable (status, ☰ menu).
 • Translation region never flickers; only its text changes.
 • Font size can be auto-fit or fixed (window grows to fit).
@@ -64,14 +104,25 @@ FEATURES
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 TRAY & OVERLAY MENU
 • Overlay → Toggle, Snap Overlay Back, Font Size, Border, Show Region Border
-• Scan → Scan Interval (how often chat is translated)
-• Diagnostics → View logs, Show last error, Test overlay
+• Regions → Add Region... watches another chat pane (trade, clan, party...) with its own overlay;
+  each region can be reselected or removed. All regions share the OCR workers and translator.
+• Scan → Scan Interval (how often chat is translated), or Adaptive: scans fast while messages
+  arrive and slows down when the chat is quiet. The tray sets all regions, an overlay's ☰ menu
+  only its own region.
+• Translator → Google (online), Offline model (Argos), Offline phrase table (phrases.tsv next to
+  the app) or a local LibreTranslate-style HTTP server. Timings per translator are in Performance.
+• Languages → Chat Language (what players write) and Translate To (what the overlay shows).
+• Diagnostics → View logs, Show last error, Frame stats, Performance (live timings per stage,
+  exportable as JSON/CSV), Benchmark OCR engines, Test overlay
 • Help, Exit
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 USAGE NOTES
 • On startup, select your in-game chat region by click+drag. (ESC cancels.)
-• Overlay never captures itself (temporarily blanks text during OCR).
+• Overlay never captures itself (it is left out of the screen capture).
+• OCR only runs when the chat region visibly changes, and only on chat lines it has not read before.
+• Translations are cached per line (translations.db next to the app), so repeated messages are not sent again.
+  Frame Stats shows how many scans, lines and translations were skipped.
 • A gold border box highlights your selected region. Toggle it ON/OFF from any menu.
 • Dragging the overlay region or header does NOT affect the region being translated.
 • Overlay is click-through except when you move it.
@@ -84,11 +135,22 @@ SHORTCUTS
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 TROUBLESHOOTING / LIMITATIONS
-• Only translates Russian → English.
-• OCR accuracy may vary with chat fonts/backgrounds.
-• If translation or OCR ever stalls (more than 3 seconds), it's auto-cancelled and retried.
-• Google Translate may rate-limit on rapid use.
-• Logs and errors: See logs.txt (Diagnostics in tray/menu).
+• Lines are sorted by script: lines mostly in the chat language's alphabet are translated,
+  lines already in the target language and numbers (prices, coordinates) are shown as they are,
+  and OCR noise is hidden. Two languages sharing an alphabet (e.g. German → English) are always sent.
+• Only the message is translated: the channel mark (!, +, #, @, $, ->, [Tag]) and the "Name:" in
+  front of it are shown untouched, so player names are never translated. A "Name:" without a
+  channel mark is only kept apart once that player has written in a marked channel.
+• OCR accuracy may vary with chat fonts/backgrounds. Lines Tesseract is unsure of (below
+  OCR_MIN_CONFIDENCE) or that are mostly symbols are hidden; see Frame Stats → OCR filter.
+• After the chat scrolls only the new lines at the bottom are read again (Frame Stats → Scroll).
+  If a line looks stale after resizing or moving the chat, Reselect Region reads it all afresh.
+• If OCR ever stalls (more than 3 seconds), its worker process is killed, restarted in the background and the scan retried.
+• Google Translate may rate-limit on rapid use. Requests are paced and retried; after repeated
+  failures the translator pauses for 30s and the overlay keeps showing cached translations.
+  The offline translators avoid the network entirely.
+• Logs and errors: See logs.txt (Diagnostics in tray/menu). It rotates at ~1 MB or weekly,
+  keeping logs.txt.1–3.
 
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 CONTACT
@@ -97,35 +159,49 @@ CONTACT
 """
 
 
+# === OCR PROFILE ===
+
+def load_profile():
+    # (tuned engine settings and scale, error); a broken file falls back to the
+    # defaults. Loaded at import, before logging is set up, so the error is
+    # logged by start_monitoring.
+    try:
+        return load_ocr_profile(OCR_PROFILE_FILE), None
+    except ValueError as e:
+        return {}, str(e)
+
 # === STATE ===
 
-translator = Translator()
-last_hash = None
+ocr_profile, ocr_profile_error = load_profile()
+translation_backend = None
+translation_client = None
+line_cache = LineCache()
+preprocessor = Preprocessor(with_scale(PREPROCESS_STEPS, ocr_profile["scale"]) if "scale" in ocr_profile else PREPROCESS_STEPS)
+line_filter = LineFilter(OCR_MIN_CONFIDENCE) if OCR_MIN_CONFIDENCE is not None else None
+ocr_pool = OcrPool(OCR_ENGINE, size=OCR_POOL_SIZE, timeout=OCR_TIMEOUT, wait_timeout=OCR_WAIT_TIMEOUT, tesseract_cmd=TESSERACT_CMD,
+                   **profile_engine_kwargs(ocr_profile))
+translation_cache = TranslationCache(os.path.join(os.path.dirname(sys.argv[0]), "translations.db"))
+language_router = LanguageRouter()
+chat_parser = ChatParser() if PARSE_CHAT_LINES else None
+src_lang = SRC_LANG
+dest_lang = DEST_LANG
+regions = []  # ChatRegion per watched chat pane; replaced (not mutated) on add/remove
 enabled = True  # overlay+translation enabled/disabled
-capture_region = None
-overlay_window = None
-overlay_label = None
-overlay_position = None  # (x, y) if user moves overlay, None=stick to region
 current_font_size = 12
 font_mode = "auto"  # "auto" or "fixed"
-monitor_thread = None
-move_mode = False   # True when moving overlay
-main_root = tk.Tk()
-main_root.withdraw()
+# Work from all regions goes through these shared queues: each region keeps at most
+# its newest frame in each, and regions take turns (see pipeline.FairQueue)
+ocr_queue = FairQueue()        # capture → OCR
+translate_queue = FairQueue()  # OCR → translate
+render_queue = FairQueue()     # translate → overlay
+stages_started = False
+main_root = None  # created under __main__ so OCR worker processes don't start a Tk
+text_layout = None  # font measurement for the overlay, bound to main_root
+tray_icon = None
 border_mode = "none"  # "none" or "thin"
 
 # === BORDER BOX STATE ===
 region_border_enabled = True
-region_border_window = None
-
-# === HEADER WINDOW (MENU + STATUS) ===
-header_window = None
-status_label = None
-menu_btn = None
-
-# === ANIMATION STATE ===
-busy_anim_running = False
-busy_anim_dots = 0
 
 selecting_region = False
 
@@ -144,142 +220,117 @@ def generate_tray_icon():
     return img
 
 # === REGION BORDER BOX ===
+# The border window is created once per region and then only moved, resized,
+# shown or hidden; see _show_translation_tk for how redraws are diffed.
 
-def show_region_border():
-    global region_border_window, capture_region, region_border_enabled
-    if not region_border_enabled or not capture_region:
-        hide_region_border()
+def show_region_border(region):
+    if not region_border_enabled or not region.active:
+        hide_region_border(region)
         return
-    if region_border_window and region_border_window.winfo_exists():
-        region_border_window.destroy()
-    x1, y1, x2, y2 = capture_region
+    state = region.render
+    if region.border_window is None or not region.border_window.winfo_exists():
+        state.forget("border.")
+        region.border_window = border_window = tk.Toplevel(main_root)
+        border_window.title(f"L2T Region Border – {region.name}")
+        border_window.overrideredirect(True)
+        border_window.wm_attributes("-topmost", True)
+        border_window.attributes("-alpha", 1.0)
+        border_window.wm_attributes("-transparentcolor", "blue")
+        # Make click-through
+        border_window.update_idletasks()
+        hwnd = win32gui.FindWindow(None, border_window.title())
+        style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+        win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE,
+                               style | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT)
+        region.border_canvas = tk.Canvas(border_window, bg="blue", highlightthickness=0)
+        region.border_canvas.pack(fill="both", expand=True)
+        region.border_rect = region.border_canvas.create_rectangle(0, 0, 0, 0, outline="#FFD700", width=2)
+    x1, y1, x2, y2 = region.bbox
     width = x2 - x1
     height = y2 - y1
-    region_border_window = tk.Toplevel(main_root)
-    region_border_window.geometry(f"{width}x{height}+{x1}+{y1}")
-    region_border_window.overrideredirect(True)
-    region_border_window.wm_attributes("-topmost", True)
-    region_border_window.attributes("-alpha", 1.0)
-    region_border_window.wm_attributes("-transparentcolor", "blue")
-    # Make click-through
-    region_border_window.update_idletasks()
-    hwnd = win32gui.FindWindow(None, region_border_window.title())
-    style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-    win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE,
-                           style | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT)
-    canvas = tk.Canvas(region_border_window, bg="blue", highlightthickness=0)
-    canvas.pack(fill="both", expand=True)
-    border_color = "#FFD700"
-    border_width = 2
-    canvas.create_rectangle(
-        border_width // 2, border_width // 2,
-        width - border_width // 2, height - border_width // 2,
-        outline=border_color, width=border_width
-    )
-    region_border_window.lift()
-
-def hide_region_border():
-    global region_border_window
-    if region_border_window and region_border_window.winfo_exists():
-        region_border_window.destroy()
-        region_border_window = None
+    if state.changed("border.geometry", region.bbox):
+        border_width = 2
+        region.border_window.geometry(f"{width}x{height}+{x1}+{y1}")
+        region.border_canvas.coords(region.border_rect, border_width // 2, border_width // 2,
+                                    width - border_width // 2, height - border_width // 2)
+    if state.changed("border.visible", True):
+        region.border_window.deiconify()
+        region.border_window.lift()
+
+def hide_region_border(region):
+    if region.border_window and region.border_window.winfo_exists():
+        if region.render.changed("border.visible", False):
+            region.border_window.withdraw()
 
 def toggle_region_border(icon=None, item=None):
     global region_border_enabled
     region_border_enabled = not region_border_enabled
-    if region_border_enabled:
-        show_region_border()
-    else:
-        hide_region_border()
+    for region in regions:
+        if region_border_enabled:
+            main_root.after(0, show_region_border, region)
+        else:
+            main_root.after(0, hide_region_border, region)
 
 # === STATUS UPDATE ===
 
-def set_status(msg, temporary=False):
-    global status_label
+def set_status(msg, temporary=False, region=None):
+    # Shown in the header of the given region, or of every region
+    for target in ([region] if region else regions):
+        _set_region_status(target, msg, temporary)
+
+def _set_region_status(region, msg, temporary):
     try:
+        status_label = region.status_label
         if status_label and status_label.winfo_exists():
             status_label.config(text=msg)
             if temporary:
                 def reset():
-                    if status_label and status_label.winfo_exists():
+                    if status_label.winfo_exists():
                         status_label.config(text="Translating..." if enabled else "Paused")
                 status_label.after(2100, reset)
     except Exception as e:
         log_error(f"set_status error: {e}")
 
-def animate_busy_status():
-    global busy_anim_running, busy_anim_dots
-    if not busy_anim_running:
+def animate_busy_status(region):
+    if not region.busy_anim_running:
         return
-    dots = "." * (1 + (busy_anim_dots % 3))
-    set_status(f"Translating{dots}")
-    busy_anim_dots = (busy_anim_dots + 1) % 3
+    dots = "." * (1 + (region.busy_anim_dots % 3))
+    set_status(f"Translating{dots}", region=region)
+    region.busy_anim_dots = (region.busy_anim_dots + 1) % 3
     try:
-        if status_label and status_label.winfo_exists():
-            status_label.after(400, animate_busy_status)
+        if region.status_label and region.status_label.winfo_exists():
+            region.status_label.after(400, animate_busy_status, region)
     except Exception as e:
         log_error(f"animate_busy_status error: {e}")
 
-def start_busy_animation():
-    global busy_anim_running, busy_anim_dots
-    busy_anim_running = True
-    busy_anim_dots = 0
-    animate_busy_status()
+def start_busy_animation(region):
+    region.busy_anim_running = True
+    region.busy_anim_dots = 0
+    animate_busy_status(region)
 
-def stop_busy_animation():
-    global busy_anim_running
-    busy_anim_running = False
-    set_status("Translating..." if enabled else "Paused")
+def stop_busy_animation(region):
+    region.busy_anim_running = False
+    set_status("Translating..." if enabled else "Paused", region=region)
 
 # === UTIL ===
 
-def _sanitize_text(text):
-    lines = [line.rstrip() for line in text.strip().splitlines()]
-    new_lines = []
-    prev_blank = False
-    for line in lines:
-        if line.strip() == "":
-            if not prev_blank:
-                new_lines.append("")
-            prev_blank = True
-        else:
-            new_lines.append(line)
-            prev_blank = False
-    return "\n".join(new_lines).replace("\n\n","\n").replace("\n\n","\n")
-
-def _get_fitting_font_size(text, width, height, min_size=8, max_size=32, font_name="Arial"):
-    test_root = tk.Tk()
-    test_root.withdraw()
-    for size in reversed(range(min_size, max_size+1)):
-        font = (font_name, size)
-        label = tk.Label(test_root, text=text, font=font, wraplength=width, justify="left")
-        label.update_idletasks()
-        req_width = label.winfo_reqwidth()
-        req_height = label.winfo_reqheight()
-        label.destroy()
-        if req_width <= width and req_height <= height:
-            test_root.destroy()
-            return size
-    test_root.destroy()
-    return min_size
+def _get_fitting_font_size(text, width, height, min_size=8, max_size=32):
+    return text_layout.fitting_size(text, width, height, min_size, max_size)
 
 def _get_text_bbox(text, font, max_width=None):
-    test_root = tk.Tk()
-    test_root.withdraw()
-    label = tk.Label(test_root, text=text, font=font, wraplength=max_width, justify="left")
-    label.update_idletasks()
-    w, h = label.winfo_reqwidth(), label.winfo_reqheight()
-    label.destroy()
-    test_root.destroy()
-    return w, h
+    return text_layout.text_size(text, font[1], max_width)
 
 # === OVERLAY CLICK-THROUGH CONTROL ===
 
-def set_overlay_clickthrough(enable):
-    global overlay_window
+def set_overlay_clickthrough(region, enable):
+    overlay_window = region.overlay_window
     if overlay_window and overlay_window.winfo_exists():
-        overlay_window.update_idletasks()
-        hwnd = win32gui.FindWindow(None, overlay_window.title())
+        if not region.render.changed("overlay.clickthrough", enable):
+            return
+        if region.overlay_hwnd is None:
+            overlay_window.update_idletasks()
+            region.overlay_hwnd = win32gui.FindWindow(None, overlay_window.title())
+        hwnd = region.overlay_hwnd
         style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
         if enable:
             style = style | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT
@@ -287,98 +338,103 @@ def set_overlay_clickthrough(enable):
             style = (style | win32con.WS_EX_LAYERED) & ~win32con.WS_EX_TRANSPARENT
         win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, style)
 
-def start_move(event):
-    global move_mode
-    move_mode = True
-    overlay_window._drag_start_x = event.x
-    overlay_window._drag_start_y = event.y
-    set_overlay_clickthrough(False)
-    set_status("Moving overlay...", temporary=True)
-
-def do_move(event):
-    global overlay_position
-    if not move_mode: return
+def start_move(region, event):
+    region.move_mode = True
+    region.overlay_window._drag_start_x = event.x
+    region.overlay_window._drag_start_y = event.y
+    set_overlay_clickthrough(region, False)
+    set_status("Moving overlay...", temporary=True, region=region)
+
+def do_move(region, event):
+    if not region.move_mode: return
+    overlay_window = region.overlay_window
     x = overlay_window.winfo_x() + event.x - overlay_window._drag_start_x
     y = overlay_window.winfo_y() + event.y - overlay_window._drag_start_y
     overlay_window.geometry(f"+{x}+{y}")
-    overlay_position = (x, y)
-    if header_window:
+    region.overlay_position = (x, y)
+    if region.header_window:
         hx = x
-        hy = y - header_window.winfo_height()
-        header_window.geometry(f"+{hx}+{max(0, hy)}")
+        hy = y - region.header_window.winfo_height()
+        region.header_window.geometry(f"+{hx}+{max(0, hy)}")
 
-def end_move(event):
-    global overlay_position
-    if not move_mode:
+def end_move(region, event):
+    if not region.move_mode:
         return
-    x = overlay_window.winfo_x()
-    y = overlay_window.winfo_y()
-    overlay_position = (x, y)
-    log_action(f"Overlay moved to ({x}, {y}) by mouse drag")
-    disable_overlay_drag_mode()
-
-
-def update_overlay_drag_bindings():
-    if overlay_window and overlay_window.winfo_exists() and overlay_label:
-        overlay_label.unbind('<Button-1>')
-        overlay_label.unbind('<B1-Motion>')
-        overlay_label.unbind('<ButtonRelease-1>')
-        overlay_window.unbind('<Button-1>')
-        overlay_window.unbind('<B1-Motion>')
-        overlay_window.unbind('<ButtonRelease-1>')
-        overlay_label.bind('<Button-1>', start_move)
-        overlay_label.bind('<B1-Motion>', do_move)
-        overlay_label.bind('<ButtonRelease-1>', end_move)
-        overlay_label.config(cursor="fleur")
+    region.move_mode = False
+    x = region.overlay_window.winfo_x()
+    y = region.overlay_window.winfo_y()
+    region.overlay_position = (x, y)
+    # The window was moved directly; make the next redraw re-apply positions
+    region.render.forget("overlay.geometry")
+    region.render.forget("header.geometry")
+    log_action(f"Overlay '{region.name}' moved to ({x}, {y}) by mouse drag")
+    disable_overlay_drag_mode(region)
+
+
+def bind_overlay_drag(region):
+    # Bound once when the overlay is created; the handlers only see clicks while
+    # the overlay is not click-through (drag mode)
+    overlay_label = region.overlay_label
+    overlay_label.bind('<Button-1>', lambda event: start_move(region, event))
+    overlay_label.bind('<B1-Motion>', lambda event: do_move(region, event))
+    overlay_label.bind('<ButtonRelease-1>', lambda event: end_move(region, event))
 
 # === HEADER WINDOW ===
 
-def enable_overlay_drag_mode():
+def enable_overlay_drag_mode(region):
+    overlay_window = region.overlay_window
     if overlay_window and overlay_window.winfo_exists():
-        set_overlay_clickthrough(False)
-        update_overlay_drag_bindings()
+        set_overlay_clickthrough(region, False)
         overlay_window.config(cursor="fleur")
-        if overlay_label:
-            overlay_label.config(cursor="fleur")
-        set_status("Drag overlay to move", temporary=True)
-        if hasattr(enable_overlay_drag_mode, 'timer_id'):
-            overlay_window.after_cancel(enable_overlay_drag_mode.timer_id)
-        enable_overlay_drag_mode.timer_id = overlay_window.after(5000, disable_overlay_drag_mode)
-
-def disable_overlay_drag_mode():
+        if region.overlay_label:
+            region.overlay_label.config(cursor="fleur")
+        set_status("Drag overlay to move", temporary=True, region=region)
+        if region.drag_timer:
+            overlay_window.after_cancel(region.drag_timer)
+        region.drag_timer = overlay_window.after(5000, disable_overlay_drag_mode, region)
+
+def disable_overlay_drag_mode(region):
+    overlay_window = region.overlay_window
+    region.drag_timer = None
     if overlay_window and overlay_window.winfo_exists():
-        set_overlay_clickthrough(True)
-        update_overlay_drag_bindings()
+        set_overlay_clickthrough(region, True)
         overlay_window.config(cursor="")
-        if overlay_label:
-            overlay_label.config(cursor="")
-        set_status("Translating..." if enabled else "Paused")
+        if region.overlay_label:
+            region.overlay_label.config(cursor="")
+        set_status("Translating..." if enabled else "Paused", region=region)
 
-def show_header_window(x, y, width):
-    global header_window, status_label, menu_btn
-    if header_window and header_window.winfo_exists():
-        header_window.geometry(f"{width}x36+{x}+{max(0, y-36)}")
+def show_header_window(region, x, y, width):
+    if region.header_window and region.header_window.winfo_exists():
+        update_header_window(region, x, y, width)
         return
-    header_window = tk.Toplevel(main_root)
-    header_window.title("L2T Overlay Header")
-    header_window.geometry(f"{width}x36+{x}+{max(0, y-36)}")
+    region.render.forget("header.")
+    region.header_window = header_window = tk.Toplevel(main_root)
+    header_window.title(f"L2T Overlay Header – {region.name}")
     header_window.wm_attributes("-topmost", True)
     header_window.attributes("-alpha", 0.94)
     header_window.overrideredirect(True)
     header_window.configure(bg="#221b23")
-    status_label = tk.Label(header_window, text="Translating..." if enabled else "Paused", font=("Arial", 10, "bold"),
+    # Region name, packed only while more than one region is watched
+    region.header_name_label = tk.Label(header_window, text=region.name, font=("Arial", 10, "bold"),
+        fg="#ffd700", bg="#221b23")
+    region.status_label = tk.Label(header_window, text="Translating..." if enabled else "Paused", font=("Arial", 10, "bold"),
         fg="white", bg="#221b23", anchor="w")
-    status_label.pack(side="left", padx=(8,0), pady=2, fill="x", expand=True)
+    region.status_label.pack(side="left", padx=(8,0), pady=2, fill="x", expand=True)
     menu_btn = tk.Button(header_window, text="☰", font=("Arial", 13, "bold"),
         bg="#221b23", fg="#ffd700", bd=0, relief="flat", cursor="hand2")
     menu_btn.pack(side="right", padx=(0,7), pady=2)
     def show_overlay_menu(event=None):
-        enable_overlay_drag_mode()
+        # Region and scan entries apply to this overlay's region only
+        enable_overlay_drag_mode(region)
         menu = tk.Menu(header_window, tearoff=0)
         menu.add_command(label="Toggle On/Off", command=lambda: toggle_enabled(None, None))
-        menu.add_command(label="Snap Overlay Back", command=lambda: snap_overlay_back())
+        menu.add_command(label="Snap Overlay Back", command=lambda: snap_overlay_back(region=region))
+        menu.add_separator()
+        menu.add_command(label="Reselect Region", command=lambda: main_root.after(0, reselect_region, region))
+        menu.add_command(label="Add Region...", command=lambda: main_root.after(0, add_region))
+        if len(regions) > 1:
+            menu.add_command(label=f"Remove Region '{region.name}'", command=lambda: main_root.after(0, remove_region, region))
         menu.add_separator()
-        menu.add_command(label="Reselect Region", command=lambda: main_root.after(0, reselect_region))
         menu.add_command(label="Font Size: Auto", command=lambda: set_font_mode_auto(None, None))
         menu.add_command(label="Font Size: Small (9)", command=lambda: set_font_size_fixed(9)(None, None))
         menu.add_command(label="Font Size: Medium (12)", command=lambda: set_font_size_fixed(12)(None, None))
@@ -389,14 +445,31 @@ def show_header_window(x, y, width):
         menu.add_separator()
         menu.add_checkbutton(label="Show Region Border", command=toggle_region_border, onvalue=True, offvalue=False, variable=tk.BooleanVar(value=region_border_enabled))
         menu.add_separator()
-        menu.add_command(label="Scan Interval: 1s", command=lambda: set_scan_interval(0)(None, None))
-        menu.add_command(label="Scan Interval: 2s", command=lambda: set_scan_interval(1)(None, None))
-        menu.add_command(label="Scan Interval: 5s", command=lambda: set_scan_interval(2)(None, None))
-        menu.add_command(label="Scan Interval: 10s", command=lambda: set_scan_interval(3)(None, None))
-        menu.add_command(label="Scan Interval: 30s", command=lambda: set_scan_interval(4)(None, None))
+        menu.add_command(label="Scan Interval: 1s", command=lambda: set_scan_interval(0, region)(None, None))
+        menu.add_command(label="Scan Interval: 2s", command=lambda: set_scan_interval(1, region)(None, None))
+        menu.add_command(label="Scan Interval: 5s", command=lambda: set_scan_interval(2, region)(None, None))
+        menu.add_command(label="Scan Interval: 10s", command=lambda: set_scan_interval(3, region)(None, None))
+        menu.add_command(label="Scan Interval: 30s", command=lambda: set_scan_interval(4, region)(None, None))
+        menu.add_command(label="Scan Interval: Adaptive", command=lambda: set_scan_adaptive(region)(None, None))
+        menu.add_separator()
+        for name, backend in TRANSLATION_BACKENDS.items():
+            menu.add_command(label=f"Translator: {backend.label}", command=lambda name=name: select_translation_backend(name)(None, None))
+        source_menu = tk.Menu(menu, tearoff=0)
+        target_menu = tk.Menu(menu, tearoff=0)
+        src_var, dest_var = tk.StringVar(value=src_lang), tk.StringVar(value=dest_lang)
+        for code, (label, _) in LANGUAGES.items():
+            source_menu.add_radiobutton(label=label, value=code, variable=src_var,
+                                        command=lambda code=code: select_languages(src=code)(None, None))
+            target_menu.add_radiobutton(label=label, value=code, variable=dest_var,
+                                        command=lambda code=code: select_languages(dest=code)(None, None))
+        menu.add_cascade(label=f"Chat Language: {LANGUAGES[src_lang][0]}", menu=source_menu)
+        menu.add_cascade(label=f"Translate To: {LANGUAGES[dest_lang][0]}", menu=target_menu)
         menu.add_separator()
         menu.add_command(label="View Logs", command=lambda: view_logs(None, None))
         menu.add_command(label="Show Last Error", command=lambda: show_last_error(None, None))
+        menu.add_command(label="Frame Stats", command=lambda: show_frame_stats(None, None))
+        menu.add_command(label="Performance", command=lambda: show_performance(None, None))
+        menu.add_command(label="Benchmark OCR Engines", command=lambda: benchmark_ocr_engines(None, None))
         menu.add_command(label="Test Overlay", command=lambda: test_overlay(None, None))
         menu.add_separator()
         menu.add_command(label="Help / Instructions", command=lambda: show_help(None, None))
@@ -406,102 +479,249 @@ def show_header_window(x, y, width):
         finally:
             menu.grab_release()
     menu_btn.config(command=show_overlay_menu)
+    # Placed last: the update packs the name label before the status label
+    update_header_window(region, x, y, width)
 
-def update_header_window(x, y, width):
-    if header_window and header_window.winfo_exists():
+def update_header_window(region, x, y, width):
+    header_window = region.header_window
+    if not header_window or not header_window.winfo_exists():
+        return
+    state = region.render
+    if state.changed("header.geometry", (x, y, width)):
         header_window.geometry(f"{width}x36+{x}+{max(0, y-36)}")
+    if state.changed("header.name", len(regions) > 1):
+        if len(regions) > 1:
+            region.header_name_label.pack(side="left", padx=(8,0), pady=2, before=region.status_label)
+        else:
+            region.header_name_label.pack_forget()
+    if state.changed("header.visible", True):
+        header_window.deiconify()
+        header_window.lift()
 
-def hide_header_window():
-    global header_window
-    if header_window and header_window.winfo_exists():
-        header_window.withdraw()
+def hide_header_window(region):
+    if region.header_window and region.header_window.winfo_exists():
+        if region.render.changed("header.visible", False):
+            region.header_window.withdraw()
 
 # === SNAP BACK ===
 
-def snap_overlay_back(icon=None, item=None):
-    global overlay_position, capture_region, overlay_window
-    if capture_region and overlay_window:
-        x1, y1, x2, y2 = capture_region
-        overlay_position = None
-        width = x2 - x1
-        height = y2 - y1
-        overlay_window.geometry(f"{width}x{height}+{x1}+{y1}")
-        update_header_window(x1, y1, width)
-        set_status("Overlay snapped back", temporary=True)
-        log_action(f"Overlay snapped back to ({x1},{y1})")
-    else:
-        set_status("Snap back failed", temporary=True)
-        log_action("Snap back failed: overlay or region missing")
+def snap_overlay_back(icon=None, item=None, region=None):
+    for target in ([region] if region else regions):
+        if target.overlay_window:
+            x1, y1, x2, y2 = target.bbox
+            target.overlay_position = None
+            show_translation(None, target)
+            set_status("Overlay snapped back", temporary=True, region=target)
+            log_action(f"Overlay '{target.name}' snapped back to ({x1},{y1})")
+        else:
+            log_action(f"Snap back failed: overlay '{target.name}' not shown yet")
 
 # === BORDER CONFIG ===
 
 def set_border_mode(mode):
     global border_mode
     border_mode = mode
-    show_translation("")
+    show_translation(None)
 
 # === TRANSLATION / OCR with TIMEOUT ===
 
-def translate_text_google(text):
+def translate_with_backend(lines):
+    client = translation_client
+    if client is None:
+        raise RuntimeError("No translator ready")
+    return client.translate_lines(lines)
+
+def make_translation_client(backend):
+    def send(batch):
+        with metrics.timer(f"translate.{backend.name}"):
+            return backend.translate_lines(batch)
+    return TranslationClient(
+        send,
+        concurrency=TRANSLATE_CONCURRENCY,
+        rate=TRANSLATE_RATE if backend.online else None,
+        burst=TRANSLATE_BURST,
+        retries=TRANSLATE_RETRIES,
+        failure_threshold=BREAKER_FAILURES,
+        reset_timeout=BREAKER_RESET,
+    )
+
+def set_translation_backend(name):
+    global translation_backend, translation_client
+    set_status("Starting translator...", temporary=True)
     try:
-        result = translator.translate(text, src="ru", dest="en")
-        return result.text
+        backend = create_backend(name, src_lang, dest_lang, phrase_table=PHRASE_TABLE_FILE, url=HTTP_TRANSLATE_URL)
     except Exception as e:
-        log_error(f"Translation error: {e}")
-        set_status("Translation Error", temporary=True)
-        return f"[Translation Error] {e}"
+        log_error(f"Could not start translator '{name}': {e}")
+        set_status("Translator unavailable", temporary=True)
+        return False
+    previous_client = translation_client
+    translation_client = make_translation_client(backend)
+    translation_backend = backend
+    if previous_client:
+        previous_client.close()
+    # Re-read the chat so what is on screen gets translated by the new backend
+    for region in regions:
+        region.pipeline.src, region.pipeline.dest = src_lang, dest_lang
+        region.pipeline.cache_tag = backend_cache_tag()
+        region.pipeline.forget()
+        region.scheduler.wake()
+    set_status(f"Translator: {backend.label}", temporary=True)
+    log_action(f"Translator set to {backend.label}")
+    return True
+
+def backend_cache_tag():
+    if translation_backend is None or translation_backend.name == "google":
+        return None
+    return translation_backend.name
+
+def select_translation_backend(name):
+    def handler(icon, item):
+        threading.Thread(target=set_translation_backend, args=(name,), daemon=True).start()
+    return handler
+
+def set_languages(src=None, dest=None):
+    # Restarts the current backend for the new pair; keeps the old pair if it can't
+    global src_lang, dest_lang
+    previous = (src_lang, dest_lang)
+    src_lang = src or src_lang
+    dest_lang = dest or dest_lang
+    if src_lang == dest_lang:
+        src_lang, dest_lang = previous
+        set_status("Source and target must differ", temporary=True)
+        return
+    name = translation_backend.name if translation_backend else TRANSLATOR_BACKEND
+    if not set_translation_backend(name):
+        # Nothing was replaced: the running client still serves the old pair
+        src_lang, dest_lang = previous
+        return
+    log_action(f"Languages set to {src_lang} → {dest_lang}")
+    set_status(f"Translating {LANGUAGES[src_lang][0]} → {LANGUAGES[dest_lang][0]}", temporary=True)
 
-def ocr_worker(image):
+def select_languages(src=None, dest=None):
+    def handler(icon, item):
+        threading.Thread(target=set_languages, args=(src, dest), daemon=True).start()
+    return handler
+
+def translate_text_google(pipeline, text):
+    # On failure the overlay keeps cached translations and shows the rest untranslated
     try:
-        return pytesseract.image_to_string(image, lang="rus+eng")
+        return pipeline.translate_text(text)
+    except PartialTranslation as e:
+        if isinstance(e.error, CircuitOpen):
+            logger.warning(f"Translation skipped: {e.error}")
+            set_status("Translator paused – cached only", temporary=True, region=pipeline.source)
+        else:
+            log_error(f"Translation error: {e.error}")
+            set_status("Translation Error", temporary=True, region=pipeline.source)
+        return e.text
     except Exception as e:
-        log_error(f"OCR error: {e}")
-        set_status("OCR Error", temporary=True)
-        return "[OCR Error]"
-
-def get_text_from_chat():
-    if not capture_region:
-        return ""
+        log_error(f"Translation error: {e}")
+        set_status("Translation Error", temporary=True, region=pipeline.source)
+        return None
+
+def make_capture_source():
+    if CAPTURE_SOURCE == "replay":
+        return create_capture_source("replay", path=CAPTURE_REPLAY_PATH, loop=True)
+    return create_capture_source(CAPTURE_SOURCE)
+
+def capture_frame(region):
+    # Returns None when the region looks the same as last time, so OCR is skipped.
+    # The overlay is a layered window, which the screen grabbers leave out.
+    with metrics.timer("capture.grab"):
+        image = region.capture_source.grab(region.bbox)
+    if image is None:
+        return None
+    with metrics.timer("capture.detect"):
+        return region.pipeline.capture(image)
+
+def ocr_frame(frame):
+    region = frame.source
     try:
-        start_busy_animation()
-        if overlay_label and overlay_label.winfo_exists():
-            overlay_label.config(text="")
-        image = ImageGrab.grab(bbox=capture_region)
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(ocr_worker, image)
-            try:
-                text = future.result(timeout=3)
-            except concurrent.futures.TimeoutError:
-                log_error("OCR timed out (stuck on image_to_string).")
-                set_status("OCR Timeout – retrying", temporary=True)
-                text = "[OCR Timeout]"
-        stop_busy_animation()
-        return text
+        start_busy_animation(region)
+        with metrics.timer("ocr"):
+            return region.pipeline.ocr(frame)
+    except OcrTimeout as e:
+        log_error(f"OCR timed out ({region.name}): {e}")
+        set_status("OCR Timeout – retrying", temporary=True, region=region)
     except Exception as e:
-        log_error(f"OCR error: {e}")
-        stop_busy_animation()
-        set_status("OCR Error", temporary=True)
-        return ""
+        log_error(f"OCR error ({region.name}): {e}")
+        set_status("OCR Error", temporary=True, region=region)
+    finally:
+        stop_busy_animation(region)
+    region.pipeline.reset()
+    return None
+
+def translate_frame(frame):
+    pipeline = frame.source.pipeline
+    with metrics.timer("translate"):
+        translated = translate_text_google(pipeline, frame.text)
+    # Skip the redraw when the OCR text changed only by jitter the line diff absorbed
+    if not translated or translated == pipeline.last_translated:
+        return None
+    pipeline.last_translated = translated
+    frame.translated = translated
+    return frame
+
+def render_frame(frame):
+    # Waits until Tk has drawn the frame, so frames arriving meanwhile replace
+    # each other in render_queue instead of piling up as Tk callbacks.
+    if not frame.source.active:
+        return
+    done = threading.Event()
+    def draw():
+        try:
+            with metrics.timer("render"):
+                _show_translation_tk(frame.source, frame.translated)
+            metrics.record("capture→overlay", time.perf_counter() - frame.captured_at)
+        finally:
+            done.set()
+    main_root.after(0, draw)
+    done.wait(timeout=5)
+    log_action(f"Translated and displayed chat text ({frame.source.name})")
 
 # === OVERLAY DRAW/UPDATE ===
+# Retained mode: the overlay, header and border windows of a region are created
+# once, and each redraw compares what it wants with region.render (what was last
+# applied) so only changed text, fonts, geometry or visibility reach Tk/Win32.
+
+def _create_overlay_window(region):
+    region.render.forget("overlay.")
+    region.overlay_hwnd = None
+    region.overlay_window = overlay_window = tk.Toplevel(main_root)
+    overlay_window.title(f"Translation – {region.name}")
+    overlay_window.wm_attributes("-topmost", True)
+    overlay_window.attributes("-alpha", 0.88)
+    overlay_window.configure(bg="black")
+    overlay_window.overrideredirect(True)
+    region.overlay_label = tk.Label(
+        overlay_window,
+        bg="black",
+        fg="yellow",
+        justify="left",
+        anchor="nw",
+    )
+    region.overlay_label.pack(fill="both", expand=True, padx=5, pady=5)
+    bind_overlay_drag(region)
+    log_action(f"Created overlay window for '{region.name}'")
 
-def _show_translation_tk(text):
-    global overlay_window, overlay_label, overlay_position, current_font_size, font_mode, status_label, menu_btn, header_window
+def _show_translation_tk(region, text=None):
+    # text=None redraws the text already shown (after a font, border or position change)
     try:
+        if not region.active:
+            return
         if not enabled:
-            log_action("Overlay not shown (disabled)")
-            if overlay_window:
-                overlay_window.withdraw()
-            hide_header_window()
-            hide_region_border()
+            hide_overlay(region)
             return
+        state = region.render
+        if text is None:
+            text = state.get("overlay.text", "")
+        else:
+            text = sanitize_text(text)
 
-        x1, y1, x2, y2 = capture_region
+        x1, y1, x2, y2 = region.bbox
         region_width = x2 - x1
         region_height = y2 - y1
 
-        text = _sanitize_text(text)
-
         if font_mode == "auto":
             best_font_size = _get_fitting_font_size(text, region_width-10, region_height-8)
             font = ("Arial", best_font_size)
@@ -512,111 +732,163 @@ def _show_translation_tk(text):
             overlay_width += 10
             overlay_height += 8
 
-        if overlay_position is not None:
-            ox, oy = overlay_position
+        if region.overlay_position is not None:
+            ox, oy = region.overlay_position
         else:
             ox, oy = x1, y1
 
-        create_new = (overlay_window is None or not overlay_window.winfo_exists())
-        if create_new:
-            overlay_window = tk.Toplevel(main_root)
-            overlay_window.title("Translation")
-            overlay_window.geometry(f"{overlay_width}x{overlay_height}+{ox}+{oy}")
-            overlay_window.wm_attributes("-topmost", True)
-            overlay_window.attributes("-alpha", 0.88)
-            overlay_window.configure(bg="black")
-            overlay_window.overrideredirect(True)
-            if border_mode == "thin":
-                overlay_window.configure(highlightthickness=2, highlightbackground="#ffd700")
-            else:
-                overlay_window.configure(highlightthickness=0)
-
-            overlay_label = tk.Label(
-                overlay_window,
-                text=text,
-                font=font,
-                bg="black",
-                fg="yellow",
-                justify="left",
-                anchor="nw",
-                wraplength=overlay_width-8
-            )
-            overlay_label.pack(fill="both", expand=True, padx=5, pady=5)
+        if region.overlay_window is None or not region.overlay_window.winfo_exists():
+            _create_overlay_window(region)
+        overlay_window, overlay_label = region.overlay_window, region.overlay_label
+        ops_before = state.ops
 
-            set_overlay_clickthrough(True)
-            update_overlay_drag_bindings()
-            log_action("Created overlay window")
-        else:
+        if state.changed("overlay.geometry", (overlay_width, overlay_height, ox, oy)):
             overlay_window.geometry(f"{overlay_width}x{overlay_height}+{ox}+{oy}")
+        if state.changed("overlay.border", border_mode):
             if border_mode == "thin":
                 overlay_window.configure(highlightthickness=2, highlightbackground="#ffd700")
             else:
                 overlay_window.configure(highlightthickness=0)
+        if state.changed("overlay.font", (font, overlay_width - 8)):
             overlay_label.config(font=font, wraplength=overlay_width-8)
+        if state.changed("overlay.text", text):
+            overlay_label.config(text=text)
+        if state.changed("overlay.visible", True):
+            overlay_window.deiconify()
+            overlay_window.lift()
+        if not region.move_mode and not region.drag_timer:
+            set_overlay_clickthrough(region, True)
 
-        overlay_label.config(text=text)
-        overlay_window.deiconify()
-        overlay_window.lift()
-        set_overlay_clickthrough(True)
-        update_overlay_drag_bindings()
-
-        show_header_window(ox, oy, overlay_width)
-        header_window.deiconify()
-        header_window.lift()
+        show_header_window(region, ox, oy, overlay_width)
 
         # SHOW OR UPDATE REGION BORDER BOX
         if region_border_enabled:
-            show_region_border()
+            show_region_border(region)
         else:
-            hide_region_border()
+            hide_region_border(region)
+        metrics.inc("render.ops", state.ops - ops_before)
     except Exception:
         log_error(traceback.format_exc())
 
-def show_translation(text):
-    main_root.after(0, _show_translation_tk, text)
-
-def hide_overlay():
-    global overlay_window
-    if overlay_window:
-        overlay_window.withdraw()
-        hide_header_window()
-    hide_region_border()
+def show_translation(text, region=None):
+    for target in ([region] if region else regions):
+        main_root.after(0, _show_translation_tk, target, text)
+
+def hide_overlay(region):
+    if region.overlay_window and region.overlay_window.winfo_exists():
+        if region.render.changed("overlay.visible", False):
+            region.overlay_window.withdraw()
+        hide_header_window(region)
+    hide_region_border(region)
+
+def destroy_overlay(region):
+    # Only for a removed region; everything else keeps its windows
+    for window in (region.overlay_window, region.header_window, region.border_window):
+        if window and window.winfo_exists():
+            window.destroy()
+    region.overlay_window = region.overlay_label = region.overlay_hwnd = None
+    region.header_window = region.header_name_label = region.status_label = None
+    region.border_window = region.border_canvas = region.border_rect = None
+    region.render.forget()
 
 # === MONITOR/LOOP ===
 
-def monitor_chat():
-    global last_hash
-    while True:
+def probe_chat_bottom(region):
+    # Cheap change signal for adaptive scans: new messages appear at the bottom,
+    # so only a thin strip there is grabbed while the scheduler is backing off.
+    if not region.active or not enabled or selecting_region:
+        return False
+    x1, y1, x2, y2 = region.bbox
+    try:
+        with metrics.timer("capture.probe"):
+            strip = region.probe_source.grab((x1, max(y1, y2 - PROBE_HEIGHT), x2, y2))
+            return strip is not None and region.probe_detector.changed(strip)
+    except Exception:
+        return False
+
+def monitor_region(region):
+    # Capture stage of one region: only grabs frames and hands changed ones to the
+    # shared OCR queue, so a slow OCR or translation never delays the next capture.
+    while region.active:
         try:
             if enabled and not selecting_region:
-                text = get_text_from_chat().strip()
-                if text:
-                    text_hash = hashlib.md5(text.encode()).hexdigest()
-                    if text_hash != last_hash:
-                        last_hash = text_hash
-                        translated = translate_text_google(text)
-                        if translated:
-                            show_translation(translated)
-                            log_action("Translated and displayed chat text")
+                frame = capture_frame(region)
+                region.scheduler.record(frame is not None)
+                if frame is not None:
+                    ocr_queue.put(frame)
             else:
-                hide_overlay()
-            time.sleep(SCAN_INTERVALS[scan_interval_idx])
+                main_root.after(0, hide_overlay, region)
+            translation_cache.maybe_flush()
+            region.scheduler.wait(probe=lambda: probe_chat_bottom(region))
         except Exception:
             log_error(traceback.format_exc())
 
+def make_region(name, bbox):
+    scheduler = ScanScheduler(ADAPTIVE_MIN_INTERVAL, ADAPTIVE_MAX_INTERVAL)
+    if scan_adaptive:
+        scheduler.set_adaptive()
+    else:
+        scheduler.set_fixed(SCAN_INTERVALS[scan_interval_idx])
+    pipeline = ChatPipeline(
+        recognize=ocr_pool.recognize_lines if line_filter else ocr_pool.recognize,
+        translate_lines=translate_with_backend,
+        change_detector=ChangeDetector(),
+        preprocessor=preprocessor,
+        line_cache=line_cache,
+        translation_cache=translation_cache,
+        src=src_lang,
+        dest=dest_lang,
+        router=language_router,
+        chat_parser=chat_parser,
+        scroll_tracker=ScrollTracker() if SCROLL_BAND_OCR else None,
+        ocr_parallel=min(OCR_PARALLEL, OCR_POOL_SIZE),
+        idle_workers=ocr_pool.idle_workers,
+        line_filter=line_filter,
+    )
+    pipeline.cache_tag = backend_cache_tag()
+    region = ChatRegion(name, bbox, pipeline, scheduler, ChangeDetector())
+    # Separate sources for the full region and the probe strip, so neither
+    # grabber has to resize its buffer between grabs
+    region.capture_source = make_capture_source()
+    region.probe_source = make_capture_source()
+    pipeline.source = region
+    return region
+
+def start_region(region):
+    region.capture_thread = threading.Thread(target=monitor_region, args=(region,), name=f"capture-{region.name}", daemon=True)
+    region.capture_thread.start()
+    log_action(f"Started capture thread for region '{region.name}' {region.bbox}")
+
 def start_monitoring():
-    global monitor_thread
-    monitor_thread = threading.Thread(target=monitor_chat, daemon=True)
-    monitor_thread.start()
-    log_action("Started chat monitor thread")
+    # OCR and translation workers are shared by all regions, so their number stays
+    # the same however many regions are watched
+    global stages_started
+    register_metric_gauges()
+    if not set_translation_backend(TRANSLATOR_BACKEND) and TRANSLATOR_BACKEND != "google":
+        set_translation_backend("google")
+    ocr_pool.start()
+    log_action(f"OCR engine: {ocr_pool.name} ({ocr_pool.size} workers)")
+    if ocr_profile_error:
+        log_error(f"Ignoring OCR profile: {ocr_profile_error}")
+    log_action(profile_text(ocr_profile))
+    on_error = lambda: log_error(traceback.format_exc())
+    for i in range(OCR_WORKERS):
+        Stage(f"ocr-{i}", ocr_queue, ocr_frame, translate_queue, on_error).start()
+    for i in range(TRANSLATE_WORKERS):
+        Stage(f"translate-{i}", translate_queue, translate_frame, render_queue, on_error).start()
+    Stage("render", render_queue, render_frame, on_error=on_error).start()
+    stages_started = True
+    for region in regions:
+        start_region(region)
 
 # === REGION SELECTOR ===
 
-def select_region(allow_cancel=True):
-    global selecting_region, capture_region, overlay_position
+def select_region(allow_cancel=True, title="Select your in-game chat window"):
+    # Returns the (x1, y1, x2, y2) box the user dragged, or None if canceled.
+    # Capture in every region is paused meanwhile.
+    global selecting_region
     selecting_region = True
     region = []
-    overlay_position = None  # reset output position to match region
 
     root = tk.Toplevel(main_root)
     root.attributes("-fullscreen", True)
@@ -625,7 +897,11 @@ def select_region(allow_cancel=True):
     root.title("Select Chat Region")
 
     try:
-        screen_image = ImageGrab.grab()
+        source = make_capture_source()
+        try:
+            screen_image = Image.fromarray(source.grab())
+        finally:
+            source.close()
     except Exception as e:
         log_error(f"Could not grab screen for selection: {e}")
         screen_image = Image.new("RGB", (1920, 1080), "black")  # fallback
@@ -646,12 +922,18 @@ def select_region(allow_cancel=True):
     overlay_id = canvas.create_image(0, 0, anchor="nw", image=overlay_photo)
     canvas.overlay_photo = overlay_photo
 
+    # Outline the regions that are already watched
+    for other in regions:
+        ox1, oy1, ox2, oy2 = other.bbox
+        canvas.create_rectangle(ox1, oy1, ox2, oy2, outline="#FFD700", width=2, dash=(4, 2))
+        canvas.create_text(ox1 + 4, oy1 + 2, text=other.name, anchor="nw", fill="#FFD700", font=("Arial", 12, "bold"))
+
     selection_box = None
     start_x = start_y = 0
 
     instruction_label = tk.Label(
         root,
-        text="🖱 Click and drag to select your in-game chat window.\nRelease mouse to confirm. Press ESC to cancel.",
+        text=f"🖱 Click and drag to {title[0].lower() + title[1:]}.\nRelease mouse to confirm. Press ESC to cancel.",
         font=("Arial", 28, "bold"),
         bg="#222",
         fg="white"
@@ -707,40 +989,81 @@ def select_region(allow_cancel=True):
     main_root.wait_window(root)
 
     selecting_region = False
-    if region:
-        capture_region = tuple(region)
-        set_status("Region updated", temporary=True)
-        log_action(f"Region set to {capture_region}")
-        show_region_border()
-    else:
-        hide_region_border()
-
-def reselect_region():
-    global capture_region, overlay_window, overlay_position
-    log_action("Reselect region initiated (tray/menu)")
-    capture_region = None
-    overlay_position = None
-    if overlay_window:
-        overlay_window.withdraw()
-    select_region()
-    log_action("Region reselected by user.")
-    show_translation("")
+    if region and region[2] > region[0] and region[3] > region[1]:
+        return tuple(region)
+    return None
+
+def reselect_region(region):
+    log_action(f"Reselect region '{region.name}' initiated (tray/menu)")
+    hide_overlay(region)  # through RenderState, so show_translation brings it back
+    bbox = select_region(title=f"Select the '{region.name}' chat window")
+    if bbox:
+        region.bbox = bbox
+        region.overlay_position = None  # reset output position to match region
+        region.pipeline.forget()
+        region.probe_detector.reset()
+        region.scheduler.wake()
+        set_status("Region updated", temporary=True, region=region)
+        log_action(f"Region '{region.name}' set to {bbox}")
+    show_translation("", region)
+
+def add_region():
+    global regions
+    name = simpledialog.askstring("Add Region", "Name for the new chat region (e.g. Trade, Clan, Party):",
+                                  initialvalue=f"Region {len(regions) + 1}", parent=main_root)
+    if not name or not name.strip():
+        return None
+    name = unique_region_name(name.strip(), regions)
+    bbox = select_region(title=f"Select the '{name}' chat window")
+    if not bbox:
+        return None
+    region = make_region(name, bbox)
+    regions = regions + [region]
+    log_action(f"Added region '{name}' {bbox}")
+    if stages_started:
+        start_region(region)
+    show_translation(None)
+    update_tray_menu()
+    return region
+
+def remove_region(region):
+    global regions
+    if len(regions) <= 1:
+        set_status("Can't remove the last region", temporary=True, region=region)
+        return
+    regions = [other for other in regions if other is not region]
+    region.active = False
+    region.scheduler.wake()
+    if region.capture_thread:
+        region.capture_thread.join(timeout=2)
+    region.capture_source.close()
+    region.probe_source.close()
+    for inbox in (ocr_queue, translate_queue, render_queue):
+        inbox.discard(region)
+    destroy_overlay(region)
+    show_translation(None)
+    update_tray_menu()
+    log_action(f"Removed region '{region.name}'")
 
 # === SYSTEM TRAY ===
 
 def toggle_enabled(icon, item):
-    global enabled, overlay_window
+    global enabled
     enabled = not enabled
     set_status("Paused" if not enabled else "Translating...", temporary=True)
     log_action(f"Toggled all: {'ON' if enabled else 'OFF'} (tray/menu)")
-    if not enabled:
-        hide_overlay()
+    for region in regions:
+        if not enabled:
+            main_root.after(0, hide_overlay, region)
+        else:
+            region.pipeline.reset()
+            region.scheduler.wake()
 
 def set_font_mode_auto(icon, item):
     global font_mode
     font_mode = "auto"
     set_status("Font: Auto-fit", temporary=True)
-    show_translation("")
+    show_translation(None)
 
 def set_font_size_fixed(size):
     def handler(icon, item):
@@ -748,15 +1071,34 @@ def set_font_size_fixed(size):
         font_mode = "fixed"
         current_font_size = size
         set_status(f"Font size: {size}", temporary=True)
-        show_translation("")
+        show_translation(None)
+    return handler
+
+def set_scan_interval(idx, region=None):
+    # From the tray (region=None) the interval applies to every region and to new ones
+    def handler(icon, item):
+        global scan_interval_idx, scan_adaptive
+        if region is None:
+            scan_interval_idx = idx
+            scan_adaptive = False
+        for target in ([region] if region else regions):
+            target.scheduler.set_fixed(SCAN_INTERVALS[idx])
+        set_status(f"Scan interval: {SCAN_INTERVALS[idx]}s", temporary=True, region=region)
+        log_action(f"Scan interval set to {SCAN_INTERVALS[idx]}s ({region.name if region else 'all regions'})")
     return handler
 
-def set_scan_interval(idx):
+def set_scan_adaptive(region=None):
+    # From the tray (region=None) adaptive scanning applies to every region and to new ones
     def handler(icon, item):
-        global scan_interval_idx
-        scan_interval_idx = idx
-        set_status(f"Scan interval: {SCAN_INTERVALS[idx]}s", temporary=True)
-        log_action(f"Scan interval set to {SCAN_INTERVALS[idx]}s")
+        global scan_adaptive
+        if region is None:
+            scan_adaptive = True
+        for target in ([region] if region else regions):
+            target.probe_detector.reset()
+            target.scheduler.set_adaptive()
+        set_status(f"Scan: Adaptive ({ADAPTIVE_MIN_INTERVAL:g}–{ADAPTIVE_MAX_INTERVAL:g}s)", temporary=True, region=region)
+        log_action(f"Scan interval set to adaptive ({ADAPTIVE_MIN_INTERVAL:g}-{ADAPTIVE_MAX_INTERVAL:g}s) "
+                   f"({region.name if region else 'all regions'})")
     return handler
 
 def set_border_mode_tray(mode):
@@ -767,9 +1109,8 @@ def set_border_mode_tray(mode):
 def view_logs(icon, item):
     log_action("Opened logs via tray")
     set_status("Opening logs.txt", temporary=True)
-    log_file = os.path.join(os.path.dirname(sys.argv[0]), "logs.txt")
     try:
-        os.startfile(log_file)
+        os.startfile(LOG_FILE)
     except Exception as e:
         log_error(f"Could not open logs: {e}")
         set_status("Failed to open logs", temporary=True)
@@ -787,6 +1128,135 @@ def show_last_error(icon, item):
     except Exception as e:
         log_error(f"Error opening error popup: {e}")
 
+def pipeline_stats_text():
+    return (f"Stale frames replaced: OCR {ocr_queue.dropped}, translate {translate_queue.dropped}, "
+            f"overlay {render_queue.dropped}")
+
+def regions_stats_text():
+    seen = sum(region.change_detector.frames_seen for region in regions)
+    skipped = sum(region.change_detector.frames_skipped for region in regions)
+    skipped_pct = 100.0 * skipped / seen if seen else 0.0
+    lines = [f"Regions: {len(regions)}, frames captured: {seen}, OCR skipped (unchanged): {skipped} ({skipped_pct:.1f}%)"]
+    lines += [region.stats_text() for region in regions]
+    return "\n".join(lines)
+
+def show_frame_stats(icon, item):
+    main_root.after(0, show_frame_stats_window)
+
+def show_frame_stats_window():
+    log_action("Show frame stats selected")
+    try:
+        win = tk.Toplevel(main_root)
+        win.title("Frame Stats")
+        win.geometry(f"640x{300 + 54 * len(regions)}+400+200")
+        tk.Label(win, text="\n".join([regions_stats_text(), preprocessor.stats_text(), line_cache.stats_text(), ocr_pool.stats_text(),
+                                  line_filter.stats_text() if line_filter else "", profile_text(ocr_profile),
+                                  language_router.stats_text(), chat_parser.stats_text() if chat_parser else "",
+                                  translation_cache.stats_text(),
+                                  translation_client.stats_text() if translation_client else "",
+                                  pipeline_stats_text()]), font=("Arial", 10), justify="left").pack(padx=10, pady=10)
+        tk.Button(win, text="OK", command=win.destroy).pack(pady=10)
+    except Exception as e:
+        log_error(f"Error opening frame stats popup: {e}")
+
+def register_metric_gauges():
+    # Counters kept by the pipeline components, read only when a snapshot is taken
+    metrics.gauge("regions", lambda: len(regions))
+    metrics.gauge("frames.captured", lambda: sum(region.change_detector.frames_seen for region in regions))
+    metrics.gauge("capture.allocations", lambda: sum(region.capture_source.allocations for region in regions))
+    metrics.gauge("frames.skipped_unchanged", lambda: sum(region.change_detector.frames_skipped for region in regions))
+    metrics.gauge("frames.replaced_stale", lambda: ocr_queue.dropped + translate_queue.dropped + render_queue.dropped)
+    metrics.gauge("ocr.line_cache_hits", lambda: line_cache.hits)
+    metrics.gauge("ocr.line_cache_misses", lambda: line_cache.misses)
+    metrics.gauge("ocr.jobs", lambda: ocr_pool.jobs)
+    if line_filter:
+        metrics.gauge("ocr.lines_low_confidence", lambda: line_filter.low_confidence)
+        metrics.gauge("ocr.lines_noise", lambda: line_filter.noise)
+    if SCROLL_BAND_OCR:
+        metrics.gauge("ocr.band_passes", lambda: sum(region.pipeline.scroll_tracker.band_passes for region in regions))
+        metrics.gauge("ocr.full_passes", lambda: sum(region.pipeline.scroll_tracker.full_passes for region in regions))
+    metrics.gauge("ocr.timeouts", lambda: ocr_pool.timeouts)
+    metrics.gauge("ocr.busy_waits", lambda: ocr_pool.busy_waits)
+    metrics.gauge("ocr.workers_restarted", lambda: ocr_pool.restarts)
+    metrics.gauge("translate.lines_passed_through", lambda: language_router.counts["keep"])
+    metrics.gauge("translate.lines_dropped", lambda: language_router.counts["drop"])
+    if chat_parser:
+        metrics.gauge("translate.header_chars_skipped", lambda: chat_parser.chars_skipped)
+        metrics.gauge("translate.senders_known", lambda: len(chat_parser.senders))
+    metrics.gauge("translate.cache_hits", lambda: translation_cache.hits)
+    metrics.gauge("translate.cache_misses", lambda: translation_cache.misses)
+    metrics.gauge("translate.lines_carried_over", lambda: sum(region.pipeline.line_differ.reused for region in regions))
+    metrics.gauge("render.ops_skipped", lambda: sum(region.render.skipped for region in regions))
+    metrics.gauge("scan.interval_s", lambda: round(min((region.scheduler.current_interval() for region in regions), default=0), 2))
+    metrics.gauge("log.dropped_records", dropped_records)
+    metrics.gauge("translate.requests", lambda: translation_client.requests if translation_client else 0)
+    metrics.gauge("translate.retries", lambda: translation_client.retried if translation_client else 0)
+    metrics.gauge("translate.failed", lambda: translation_client.failed if translation_client else 0)
+    metrics.gauge("translate.breaker_state", lambda: translation_client.breaker.state if translation_client else "-")
+    metrics.gauge("translate.rate_limited_s", lambda: round(translation_client.throttled_seconds, 1) if translation_client else 0)
+
+def show_performance(icon, item):
+    main_root.after(0, show_performance_window)
+
+def show_performance_window():
+    log_action("Performance window opened")
+    win = tk.Toplevel(main_root)
+    win.title("Performance")
+    win.geometry("600x520+400+160")
+    label = tk.Label(win, font=("Courier New", 10), justify="left", anchor="nw")
+    label.pack(padx=10, pady=10, fill="both", expand=True)
+    def refresh():
+        if not win.winfo_exists():
+            return
+        label.config(text=metrics.table_text())
+        win.after(1000, refresh)
+    def export(kind):
+        path = filedialog.asksaveasfilename(parent=win, defaultextension=f".{kind}",
+                                            initialfile=f"l2t_performance.{kind}",
+                                            filetypes=[(kind.upper(), f"*.{kind}")])
+        if not path:
+            return
+        try:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                f.write(metrics.to_json() if kind == "json" else metrics.to_csv())
+            log_action(f"Exported performance metrics to {path}")
+            set_status("Metrics exported", temporary=True)
+        except Exception as e:
+            log_error(f"Could not export metrics: {e}")
+    buttons = tk.Frame(win)
+    buttons.pack(pady=8)
+    tk.Button(buttons, text="Export JSON", command=lambda: export("json")).pack(side="left", padx=4)
+    tk.Button(buttons, text="Export CSV", command=lambda: export("csv")).pack(side="left", padx=4)
+    tk.Button(buttons, text="Close", command=win.destroy).pack(side="left", padx=4)
+    refresh()
+
+def benchmark_ocr_engines(icon, item):
+    # Runs off the Tk thread; both engines read the current chat region
+    def run():
+        if not regions:
+            set_status("Select a region first", temporary=True)
+            return
+        set_status("Benchmarking OCR...", temporary=True)
+        try:
+            source = make_capture_source()
+            try:
+                image = Image.fromarray(source.grab(regions[0].bbox))
+            finally:
+                source.close()
+            result = engine_benchmark_text(image, tesseract_cmd=TESSERACT_CMD)
+        except Exception as e:
+            result = f"OCR benchmark failed: {e}"
+        log_action("OCR engine benchmark: " + result.replace("\n", "; "))
+        main_root.after(0, show_text_window, "OCR Engine Benchmark", result)
+    threading.Thread(target=run, daemon=True).start()
+
+def show_text_window(title, text):
+    win = tk.Toplevel(main_root)
+    win.title(title)
+    win.geometry("560x150+400+200")
+    tk.Label(win, text=text, font=("Arial", 10), justify="left", wraplength=540).pack(padx=10, pady=10)
+    tk.Button(win, text="OK", command=win.destroy).pack(pady=10)
+
 def test_overlay(icon, item):
     log_action("Test overlay tray item selected")
     set_status("Test overlay", temporary=True)
@@ -798,6 +1268,12 @@ def show_help(icon, item):
 def quit_app(icon=None, item=None):
     log_action("Exiting app via tray/menu")
     set_status("Exiting...", temporary=True)
+    try:
+        translation_cache.close()
+    except Exception as e:
+        log_error(f"Could not save translation cache: {e}")
+    ocr_pool.close()
+    shutdown_logging()
     try:
         if icon is not None:
             icon.stop()
@@ -828,24 +1304,61 @@ def setup_tray():
         pystray.MenuItem("2s", set_scan_interval(1)),
         pystray.MenuItem("5s (Default)", set_scan_interval(2)),
         pystray.MenuItem("10s", set_scan_interval(3)),
-        pystray.MenuItem("30s (Slow)", set_scan_interval(4))
+        pystray.MenuItem("30s (Slow)", set_scan_interval(4)),
+        pystray.MenuItem("Adaptive", set_scan_adaptive(), checked=lambda item: all(region.scheduler.adaptive for region in regions))
+    )
+    languages_menu = pystray.Menu(
+        pystray.MenuItem("Chat Language", pystray.Menu(*[
+            pystray.MenuItem(label, select_languages(src=code), radio=True,
+                             checked=lambda item, code=code: src_lang == code)
+            for code, (label, _) in LANGUAGES.items()
+        ])),
+        pystray.MenuItem("Translate To", pystray.Menu(*[
+            pystray.MenuItem(label, select_languages(dest=code), radio=True,
+                             checked=lambda item, code=code: dest_lang == code)
+            for code, (label, _) in LANGUAGES.items()
+        ])),
     )
+    translator_menu = pystray.Menu(*[
+        pystray.MenuItem(backend.label, select_translation_backend(name), radio=True,
+                         checked=lambda item, name=name: translation_backend is not None and translation_backend.name == name)
+        for name, backend in TRANSLATION_BACKENDS.items()
+    ])
+    # Rebuilt by update_tray_menu() whenever a region is added or removed
+    regions_menu = pystray.Menu(lambda: [
+        pystray.MenuItem("Add Region...", lambda icon, item: main_root.after(0, add_region)),
+        pystray.Menu.SEPARATOR,
+    ] + [
+        pystray.MenuItem(region.name, pystray.Menu(
+            pystray.MenuItem("Reselect", lambda icon, item, region=region: main_root.after(0, reselect_region, region)),
+            pystray.MenuItem("Snap Overlay Back", lambda icon, item, region=region: snap_overlay_back(region=region)),
+            pystray.MenuItem("Remove", lambda icon, item, region=region: main_root.after(0, remove_region, region),
+                             enabled=lambda item: len(regions) > 1),
+        ))
+        for region in regions
+    ])
     diagnostics_menu = pystray.Menu(
         pystray.MenuItem("View Logs", view_logs),
         pystray.MenuItem("Show Last Error", show_last_error),
+        pystray.MenuItem("Frame Stats", show_frame_stats),
+        pystray.MenuItem("Performance", show_performance),
+        pystray.MenuItem("Benchmark OCR Engines", benchmark_ocr_engines),
         pystray.MenuItem("Test Overlay", test_overlay),
     )
 
     def tray_thread():
+        global tray_icon
         try:
-            icon = pystray.Icon(
+            tray_icon = icon = pystray.Icon(
                 "ChatTranslator",
                 generate_tray_icon(),
                 "L2 Chat Translator",
                 menu=pystray.Menu(
                     pystray.MenuItem("Overlay", overlay_menu),
-                    pystray.MenuItem("Reselect Region", lambda icon, item: main_root.after(0, reselect_region)),
+                    pystray.MenuItem("Regions", regions_menu),
                     pystray.MenuItem("Scan", scan_menu),
+                    pystray.MenuItem("Translator", translator_menu),
+                    pystray.MenuItem("Languages", languages_menu),
                     pystray.MenuItem("Diagnostics", diagnostics_menu),
                     pystray.MenuItem("Help / Instructions", show_help),
                     pystray.MenuItem("Exit", quit_app)
@@ -858,6 +1371,13 @@ def setup_tray():
     threading.Thread(target=tray_thread, daemon=True).start()
     log_action("System tray setup complete")
 
+def update_tray_menu():
+    if tray_icon is not None:
+        try:
+            tray_icon.update_menu()
+        except Exception as e:
+            log_error(f"Could not refresh tray menu: {e}")
+
 # === HELP ===
 
 def show_help_window():
@@ -876,12 +1396,22 @@ def show_help_window():
 # === MAIN ===
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    setup_logging(LOG_FILE)
     ctypes.windll.user32.SetProcessDPIAware()
+    main_root = tk.Tk()
+    main_root.withdraw()
+    text_layout = TextLayout(main_root)
     log_action("App started")
-    select_region()
+    try:
+        log_action(f"Loaded {translation_cache.load()} cached translations")
+    except Exception as e:
+        log_error(f"Could not load translation cache: {e}")
+    bbox = select_region()
 
-    if capture_region:
-        show_region_border()
+    if bbox:
+        regions = [make_region(DEFAULT_REGION_NAME, bbox)]
+        show_region_border(regions[0])
         start_monitoring()
         setup_tray()
         main_root.mainloop()
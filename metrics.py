@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+import threading
+import time
+from collections import deque
+
+# === METRICS ===
+# Hot-path recording is a deque append plus an integer add; percentiles are
+# only computed when someone reads a snapshot (Performance window, export).
+
+HISTOGRAM_WINDOW = 1024  # most recent samples kept per histogram
+
+class Histogram:
+    def __init__(self, window=HISTOGRAM_WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def snapshot(self):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {"count": self.count}
+        def pct(p):
+            return ordered[min(len(ordered) - 1, int(p / 100.0 * len(ordered)))]
+        return {
+            "count": self.count,
+            "mean": self.total / self.count,
+            "p50": pct(50),
+            "p95": pct(95),
+            "p99": pct(99),
+            "max": ordered[-1],
+        }
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, n=1):
+        self.value += n
+
+class _Timer:
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.started)
+        return False
+
+class Metrics:
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()  # only guards creation of new metrics
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def counter(self, name):
+        counter = self.counters.get(name)
+        if counter is None:
+            with self.lock:
+                counter = self.counters.setdefault(name, Counter())
+        return counter
+
+    def gauge(self, name, read):
+        # read() is called only when a snapshot is taken
+        self.gauges[name] = read
+
+    def timer(self, name):
+        return _Timer(self.histogram(name))
+
+    def record(self, name, seconds):
+        self.histogram(name).record(seconds)
+
+    def inc(self, name, n=1):
+        self.counter(name).inc(n)
+
+    def snapshot(self):
+        values = {name: c.value for name, c in list(self.counters.items())}
+        for name, read in list(self.gauges.items()):
+            try:
+                values[name] = read()
+            except Exception:
+                values[name] = None
+        return {
+            "timestamp": time.time(),
+            "timings": {name: h.snapshot() for name, h in sorted(self.histograms.items())},
+            "counters": dict(sorted(values.items())),
+        }
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_csv(self):
+        snap = self.snapshot()
+        out = io.StringIO()
+        writer = csv.writer(out)
+        writer.writerow(["metric", "kind", "count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms", "value"])
+        for name, h in snap["timings"].items():
+            ms = [f"{h[k] * 1000:.3f}" if k in h else "" for k in ("mean", "p50", "p95", "p99", "max")]
+            writer.writerow([name, "timing", h["count"], *ms, ""])
+        for name, value in snap["counters"].items():
+            writer.writerow([name, "counter", "", "", "", "", "", "", value])
+        return out.getvalue()
+
+    def table_text(self):
+        snap = self.snapshot()
+        lines = [f"{'stage':<22}{'count':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"]
+        for name, h in snap["timings"].items():
+            if "p50" not in h:
+                continue
+            lines.append(f"{name:<22}{h['count']:>7}{h['p50'] * 1000:>9.1f}{h['p95'] * 1000:>9.1f}"
+                         f"{h['p99'] * 1000:>9.1f}{h['max'] * 1000:>9.1f}")
+        lines.append("")
+        for name, value in snap["counters"].items():
+            lines.append(f"{name:<30}{value}")
+        return "\n".join(lines)
+
+metrics = Metrics()
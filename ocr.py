@@ -0,0 +1,665 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from PIL import Image, ImageStat
+from language import is_noise
+
+# === LINE SEGMENTATION ===
+
+INK_DELTA = 60         # grey distance from the background that counts as text ink
+MIN_ROW_INK = 2        # mean ink (0-255) a row needs to belong to a text line
+MIN_LINE_HEIGHT = 4    # thinner bands are treated as noise
+LINE_PADDING = 2       # rows of context kept above/below each strip
+STACK_GAP = 8          # blank rows between strips when they are OCR'd together
+MIN_STRIPS_PER_SHARD = 3  # fewer strips per parallel OCR call cost more in per-call overhead than they save
+
+def _background_level(gray):
+    histogram = gray.histogram()
+    half = gray.size[0] * gray.size[1] / 2
+    seen = 0
+    for level, count in enumerate(histogram):
+        seen += count
+        if seen >= half:
+            return level
+    return 0
+
+def ink_mask(gray, ink_delta=INK_DELTA):
+    bg = _background_level(gray)
+    return gray.point(lambda v: 255 if abs(v - bg) > ink_delta else 0)
+
+def segment_lines(image, ink_delta=INK_DELTA):
+    # Horizontal projection profile: collapse the ink mask to one column, then
+    # group consecutive inked rows into (top, bottom) bands.
+    mask = ink_mask(image.convert("L"), ink_delta)
+    w, h = mask.size
+    profile = list(mask.resize((1, h), Image.BOX).getdata())
+    bands = []
+    start = None
+    for y, ink in enumerate(profile + [0]):
+        if ink >= MIN_ROW_INK and start is None:
+            start = y
+        elif ink < MIN_ROW_INK and start is not None:
+            if y - start >= MIN_LINE_HEIGHT:
+                bands.append((max(0, start - LINE_PADDING), min(h, y + LINE_PADDING)))
+            start = None
+    return bands
+
+def strip_hash(strip, ink_delta=INK_DELTA):
+    # Hash the binarized strip so the game world moving behind the
+    # semi-transparent chat box does not invalidate cached lines.
+    mask = ink_mask(strip.convert("L"), ink_delta)
+    return hashlib.md5(mask.tobytes() + repr(mask.size).encode()).hexdigest()
+
+# === LINE CACHE ===
+
+class LineCache:
+    # Shared by every chat region's OCR worker, hence the lock
+    def __init__(self, capacity=512):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = text
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats_text(self):
+        total = self.hits + self.misses
+        hit_pct = 100.0 * self.hits / total if total else 0.0
+        return f"OCR line cache: {self.hits} hits / {self.misses} misses ({hit_pct:.1f}% reused)"
+
+# === CONFIDENCE FILTER ===
+# Engines can return structured results: OcrLine objects with the line's
+# words, each with a confidence (0-100, Tesseract's scale) and a bounding box
+# in the recognized image. Lines the engine isn't sure about or that are
+# mostly symbols (chat icons, the game world behind the pane) are dropped
+# before they can change the frame's text hash or reach the translator.
+
+MIN_CONFIDENCE = 60  # Tesseract word confidence below which a line counts as garbage
+
+class OcrWord:
+    __slots__ = ("text", "confidence", "box")
+
+    def __init__(self, text, confidence, box):
+        self.text = text
+        self.confidence = confidence  # 0-100, None if the engine has no confidences
+        self.box = box                # (left, top, right, bottom)
+
+class OcrLine:
+    __slots__ = ("words",)
+
+    def __init__(self, words):
+        self.words = words
+
+    @property
+    def text(self):
+        return " ".join(word.text for word in self.words)
+
+    @property
+    def confidence(self):
+        # Mean word confidence weighted by word length
+        scored = [(word.confidence, len(word.text)) for word in self.words if word.confidence is not None]
+        total = sum(n for _, n in scored)
+        return sum(c * n for c, n in scored) / total if total else None
+
+    @property
+    def box(self):
+        boxes = [word.box for word in self.words]
+        return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+class LineFilter:
+    # Shared by every chat region's OCR worker, hence the lock
+    def __init__(self, min_confidence=MIN_CONFIDENCE):
+        self.min_confidence = min_confidence
+        self.lock = threading.Lock()
+        self.kept = 0
+        self.low_confidence = 0
+        self.noise = 0
+
+    def keep(self, text, confidence):
+        if not text:
+            return False
+        with self.lock:
+            if confidence is not None and confidence < self.min_confidence:
+                self.low_confidence += 1
+                return False
+            if is_noise(text):
+                self.noise += 1
+                return False
+            self.kept += 1
+            return True
+
+    def stats_text(self):
+        return (f"OCR filter: {self.kept} lines kept, {self.low_confidence} below {self.min_confidence}% confidence, "
+                f"{self.noise} mostly symbols")
+
+# === INCREMENTAL OCR ===
+
+def _stack_strips(strips, background):
+    width = max(s.size[0] for s in strips)
+    height = sum(s.size[1] for s in strips) + STACK_GAP * (len(strips) + 1)
+    stacked = Image.new(strips[0].mode, (width, height), background)
+    y = STACK_GAP
+    for strip in strips:
+        stacked.paste(strip, (0, y))
+        y += strip.size[1] + STACK_GAP
+    return stacked
+
+def _recognize_stacked(strips, recognize, background, line_filter=None):
+    # One engine call for all strips. Plain text is matched to strips by line
+    # count: if the engine returns a different number of lines than strips,
+    # each strip is OCR'd alone. Structured results (line_filter given) are
+    # matched word by word by where each word sits in the stacked image (the
+    # engine may merge neighbouring strips into one line); a strip that got no
+    # words is OCR'd alone before it counts as empty. Then each strip is filtered.
+    stacked = _stack_strips(strips, background)
+    if line_filter is None:
+        recognized = [line.strip() for line in recognize(stacked).splitlines() if line.strip()]
+        if len(recognized) != len(strips):
+            recognized = [" ".join(recognize(strip).split()) for strip in strips]
+        return recognized
+    spans = []
+    y = STACK_GAP
+    for strip in strips:
+        spans.append((y, y + strip.size[1]))
+        y += strip.size[1] + STACK_GAP
+    words = [[] for _ in strips]
+    for line in recognize(stacked):
+        for word in line.words:
+            middle = (word.box[1] + word.box[3]) / 2
+            for i, (start, end) in enumerate(spans):
+                if start - STACK_GAP / 2 <= middle < end + STACK_GAP / 2:
+                    words[i].append(word)
+                    break
+    if len(strips) > 1:
+        for i, strip in enumerate(strips):
+            if not words[i]:
+                words[i] = [word for line in recognize(strip) for word in line.words]
+    texts = []
+    for strip_words in words:
+        strip_words.sort(key=lambda word: word.box[0])
+        line = OcrLine(strip_words)
+        text = " ".join(line.text.split())
+        texts.append(text if line_filter.keep(text, line.confidence) else "")
+    return texts
+
+def _recognize_sharded(strips, recognize, background, shards, line_filter=None):
+    # Splits the strips into consecutive groups that are recognized at the same
+    # time (recognize must be thread-safe, e.g. OcrPool.recognize); results are
+    # merged back in line order. The calling thread works on the first group.
+    size = -(-len(strips) // shards)
+    groups = [strips[i:i + size] for i in range(0, len(strips), size)]
+    results = [None] * len(groups)
+    errors = []
+
+    def work(index):
+        try:
+            results[index] = _recognize_stacked(groups[index], recognize, background, line_filter)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(i,), name="ocr-shard", daemon=True) for i in range(1, len(groups))]
+    for thread in threads:
+        thread.start()
+    work(0)
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return [text for group in results for text in group]
+
+def ocr_strips(image, recognize, cache, parallel=1, line_filter=None):
+    # Text of every text strip of image, top to bottom ("" where nothing was read
+    # or the line was filtered). Only strips whose content hash is not cached go to the OCR engine. They are
+    # stacked into one image so a tick costs a single engine call; when many
+    # strips are missing at once (first frame, reselected region, a big jump) and
+    # parallel > 1, they are split into up to that many stacks OCR'd side by side.
+    # With a line_filter, recognize returns OcrLines (e.g. engine.recognize_lines)
+    # and filtered strips are cached as empty, so noise is never OCR'd twice.
+    bands = segment_lines(image)
+    if not bands:
+        return []
+    w = image.size[0]
+    strips = [image.crop((0, top, w, bottom)) for top, bottom in bands]
+    keys = [strip_hash(strip) for strip in strips]
+    if line_filter is not None:
+        keys = [key + ":filtered" for key in keys]  # the unfiltered text of a strip is a different entry
+    texts = [cache.get(key) for key in keys]
+    missing = [i for i, text in enumerate(texts) if text is None]
+    if missing:
+        median = ImageStat.Stat(image).median
+        background = tuple(median) if len(median) > 1 else median[0]
+        shards = min(parallel, len(missing) // MIN_STRIPS_PER_SHARD)
+        if shards > 1:
+            recognized = _recognize_sharded([strips[i] for i in missing], recognize, background, shards, line_filter)
+        else:
+            recognized = _recognize_stacked([strips[i] for i in missing], recognize, background, line_filter)
+        for i, text in zip(missing, recognized):
+            texts[i] = text
+            cache.put(keys[i], text)
+    return texts
+
+def ocr_lines(image, recognize, cache, parallel=1, line_filter=None):
+    return "\n".join(text for text in ocr_strips(image, recognize, cache, parallel, line_filter) if text)
+
+# === OCR ENGINES ===
+# Engines load their language models once in start() and then take images
+# directly. The in-process tesserocr engine avoids spawning tesseract.exe and
+# reloading traineddata on every scan; pytesseract is kept as the fallback.
+
+class OcrEngine:
+    name = "base"
+
+    def __init__(self, lang="rus+eng", psm=6, tesseract_cmd=None, oem=None, whitelist=None, dictionary=True, timeout=None):
+        self.lang = lang
+        self.psm = psm
+        self.tesseract_cmd = tesseract_cmd
+        self.oem = oem              # Tesseract engine mode: 0 legacy, 1 LSTM only, 2 both, None = default
+        self.whitelist = whitelist  # only these characters are recognized (spaces always are)
+        self.dictionary = dictionary  # False skips the word lists, which rarely know player slang
+        self.timeout = timeout      # seconds per call for engines that run tesseract as a subprocess; None = no limit
+
+    def tesseract_args(self):
+        args = ["--psm", str(self.psm)]
+        if self.oem is not None:
+            args += ["--oem", str(self.oem)]
+        for name, value in self.tesseract_variables().items():
+            args += ["-c", f"{name}={value}"]
+        return args
+
+    def tesseract_variables(self):
+        variables = {}
+        if self.whitelist:
+            # Quotes and backslashes can't survive pytesseract's config splitting on every OS
+            variables["tessedit_char_whitelist"] = "".join(
+                ch for ch in self.whitelist if not ch.isspace() and ch not in "'\"\\")
+        if not self.dictionary:
+            variables["load_system_dawg"] = "0"
+            variables["load_freq_dawg"] = "0"
+        return variables
+
+    def start(self):
+        pass
+
+    def recognize(self, image):
+        raise NotImplementedError
+
+    def recognize_lines(self, image):
+        # [OcrLine]; engines without word data give each line one word with no
+        # confidence and a box spanning the image's width at an even share of its height
+        lines = [line for line in self.recognize(image).splitlines() if line.strip()]
+        w, h = image.size
+        step = h / max(1, len(lines))
+        return [OcrLine([OcrWord(line.strip(), None, (0, round(i * step), w, round((i + 1) * step)))])
+                for i, line in enumerate(lines)]
+
+    def close(self):
+        pass
+
+class PytesseractEngine(OcrEngine):
+    name = "pytesseract"
+
+    def start(self):
+        import pytesseract
+        if self.tesseract_cmd and os.path.exists(self.tesseract_cmd):
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        self.pytesseract = pytesseract
+        self.config = " ".join(self.tesseract_args())
+
+    def recognize(self, image):
+        # pytesseract kills tesseract itself on timeout; killing only our worker
+        # process would leave tesseract.exe running
+        return self.pytesseract.image_to_string(image, lang=self.lang, config=self.config, timeout=self.timeout or 0)
+
+    def recognize_lines(self, image):
+        data = self.pytesseract.image_to_data(image, lang=self.lang, config=self.config, timeout=self.timeout or 0,
+                                              output_type=self.pytesseract.Output.DICT)
+        lines = OrderedDict()
+        for i, text in enumerate(data["text"]):
+            confidence = float(data["conf"][i])
+            if confidence < 0 or not text.strip():
+                continue  # block/paragraph/line rows and empty words
+            left, top = data["left"][i], data["top"][i]
+            word = OcrWord(text.strip(), confidence, (left, top, left + data["width"][i], top + data["height"][i]))
+            lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(word)
+        return [OcrLine(words) for words in lines.values()]
+
+class TesserocrEngine(OcrEngine):
+    name = "tesserocr"
+
+    def start(self):
+        import tesserocr
+        kwargs = {"lang": self.lang, "psm": self.psm}
+        if self.oem is not None:
+            kwargs["oem"] = self.oem
+        variables = self.tesseract_variables()
+        whitelist = variables.pop("tessedit_char_whitelist", None)
+        if variables:
+            kwargs["variables"] = variables  # dictionary switches only work at init
+        if self.tesseract_cmd:
+            tessdata = os.path.join(os.path.dirname(self.tesseract_cmd), "tessdata")
+            if os.path.isdir(tessdata):
+                kwargs["path"] = tessdata
+        self.api = tesserocr.PyTessBaseAPI(**kwargs)
+        if whitelist:
+            self.api.SetVariable("tessedit_char_whitelist", whitelist)
+        self.tesserocr = tesserocr
+        self.lock = threading.Lock()
+
+    def recognize(self, image):
+        # Hand the raw 8-bit buffer to libtesseract; no temp file, no subprocess
+        gray = image.convert("L")
+        w, h = gray.size
+        with self.lock:
+            self.api.SetImageBytes(gray.tobytes(), w, h, 1, w)
+            return self.api.GetUTF8Text()
+
+    def recognize_lines(self, image):
+        gray = image.convert("L")
+        w, h = gray.size
+        RIL = self.tesserocr.RIL
+        lines = []
+        with self.lock:
+            self.api.SetImageBytes(gray.tobytes(), w, h, 1, w)
+            self.api.Recognize()
+            for word in self.tesserocr.iterate_level(self.api.GetIterator(), RIL.WORD):
+                text = word.GetUTF8Text(RIL.WORD)
+                if not text or not text.strip():
+                    continue
+                if not lines or word.IsAtBeginningOf(RIL.TEXTLINE):
+                    lines.append([])
+                lines[-1].append(OcrWord(text.strip(), word.Confidence(RIL.WORD), word.BoundingBox(RIL.WORD)))
+        return [OcrLine(words) for words in lines]
+
+    def close(self):
+        self.api.End()
+
+OCR_ENGINES = {engine.name: engine for engine in (TesserocrEngine, PytesseractEngine)}
+
+def create_engine(name="auto", **kwargs):
+    # "auto" prefers the in-process engine and falls back to pytesseract
+    candidates = list(OCR_ENGINES) if name == "auto" else [name]
+    last_error = None
+    for candidate in candidates:
+        engine = OCR_ENGINES[candidate](**kwargs)
+        try:
+            engine.start()
+            return engine
+        except Exception as e:
+            last_error = e
+    raise RuntimeError(f"No OCR engine available: {last_error}")
+
+def measure_engine(name, image, runs=5, **kwargs):
+    # Returns (cold start seconds, list of per-call seconds) for one engine
+    started = time.perf_counter()
+    engine = OCR_ENGINES[name](**kwargs)
+    engine.start()
+    engine.recognize(image)
+    cold = time.perf_counter() - started
+    calls = []
+    try:
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            engine.recognize(image)
+            calls.append(time.perf_counter() - t0)
+    finally:
+        engine.close()
+    return cold, calls
+
+def engine_benchmark_text(image, runs=5, **kwargs):
+    lines = []
+    for name in OCR_ENGINES:
+        try:
+            cold, calls = measure_engine(name, image, runs, **kwargs)
+            calls.sort()
+            lines.append(f"{name}: cold start {cold * 1000:.0f} ms, per call median "
+                         f"{calls[len(calls) // 2] * 1000:.0f} ms, best {calls[0] * 1000:.0f} ms")
+        except Exception as e:
+            lines.append(f"{name}: unavailable ({e})")
+    return "\n".join(lines)
+
+# === OCR PROFILE ===
+# The engine settings and scale factor benchmarks/tune_ocr.py found fastest on
+# the user's own chat while staying accurate enough, saved as JSON:
+#   {"engine": "tesserocr", "lang": "rus", "psm": 6, "oem": 1, "whitelist": null,
+#    "dictionary": false, "scale": 2, "cer": 0.012, "ms_per_frame": 41.0, "tuned_at": "..."}
+
+PROFILE_ENGINE_KEYS = ("lang", "psm", "oem", "whitelist", "dictionary")
+MAX_PROFILE_SCALE = 4  # larger upscales only slow Tesseract down
+
+def _is_int(value, low, high):
+    return isinstance(value, int) and not isinstance(value, bool) and low <= value <= high
+
+def _check_profile(profile):
+    # Message for the first unusable value, None when the profile is fine
+    checks = (
+        ("scale", lambda v: _is_int(v, 1, MAX_PROFILE_SCALE), f"an integer from 1 to {MAX_PROFILE_SCALE}"),
+        ("psm", lambda v: _is_int(v, 0, 13), "an integer from 0 to 13"),
+        ("oem", lambda v: v is None or _is_int(v, 0, 3), "null or an integer from 0 to 3"),
+        ("lang", lambda v: isinstance(v, str) and v.strip() != "", "a language model name such as \"rus+eng\""),
+        ("whitelist", lambda v: v is None or isinstance(v, str), "null or a string of characters"),
+        ("dictionary", lambda v: isinstance(v, bool), "true or false"),
+    )
+    for key, valid, expected in checks:
+        if key in profile and not valid(profile[key]):
+            return f"{key} must be {expected}, not {profile[key]!r}"
+    return None
+
+def load_ocr_profile(path):
+    # {} when there is no profile; ValueError when the file can't be used
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        raise ValueError(f"{path}: {e}")
+    if not isinstance(profile, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    problem = _check_profile(profile)
+    if problem:
+        raise ValueError(f"{path}: {problem}")
+    return profile
+
+def save_ocr_profile(path, profile):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+def profile_engine_kwargs(profile):
+    return {key: profile[key] for key in PROFILE_ENGINE_KEYS if key in profile}
+
+def profile_text(profile):
+    if not profile:
+        return "OCR profile: defaults (run benchmarks/tune_ocr.py to tune)"
+    parts = [profile.get("engine", "auto"), profile.get("lang", "rus+eng"), f"psm {profile.get('psm', 6)}"]
+    if profile.get("oem") is not None:
+        parts.append(f"oem {profile['oem']}")
+    parts.append(f"scale {profile.get('scale', 2)}")
+    if profile.get("whitelist"):
+        parts.append(f"whitelist of {len(profile['whitelist'])} chars")
+    if profile.get("dictionary") is False:
+        parts.append("no dictionary")
+    text = "OCR profile: " + ", ".join(parts)
+    if "cer" in profile and "ms_per_frame" in profile:
+        text += f" (tuned: {profile['cer'] * 100:.1f}% CER, {profile['ms_per_frame']:.0f} ms/frame)"
+    return text
+
+# === SUPERVISED WORKER POOL ===
+# Each worker is a child process that creates its engine once and then serves
+# OCR jobs over a pipe. A job that exceeds its timeout gets its process
+# terminated (a thread could not be stopped); a replacement is spawned and
+# warmed up in the background so the caller does not wait for it.
+
+class OcrTimeout(Exception):
+    pass
+
+def _worker_main(conn, engine_name, engine_kwargs):
+    engine = create_engine(engine_name, **engine_kwargs)
+    engine.recognize(Image.new("L", (64, 16), 0))  # warm-up pass
+    conn.send(("ready", engine.name))
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        method, mode, size, data = job
+        try:
+            conn.send(("ok", getattr(engine, method)(Image.frombytes(mode, size, data))))
+        except Exception as e:
+            conn.send(("error", str(e)))
+    engine.close()
+
+ENGINE_TIMEOUT_MARGIN = 0.5  # a worker's engine gives up this much before the pool kills the worker
+
+class _Worker:
+    def __init__(self, engine_name, engine_kwargs):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child_conn, engine_name, engine_kwargs), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.engine_name = None
+
+    def wait_ready(self, timeout):
+        if not self.conn.poll(timeout):
+            raise OcrTimeout("OCR worker did not start in time")
+        status, payload = self.conn.recv()
+        self.engine_name = payload
+
+    def kill(self):
+        try:
+            self.process.terminate()
+            self.process.join(timeout=2)
+            if self.process.is_alive():
+                self.process.kill()
+        finally:
+            self.conn.close()
+
+class OcrPool:
+    def __init__(self, engine_name="auto", size=1, timeout=3, start_timeout=30, wait_timeout=10, **engine_kwargs):
+        self.engine_name = engine_name
+        self.engine_kwargs = engine_kwargs
+        self.size = size
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout  # for a free worker; a busy pool is not a stuck job
+        self.start_timeout = start_timeout
+        # The engine stops a hung tesseract subprocess before the worker is killed
+        self.engine_kwargs.setdefault("timeout", max(0.5, timeout - ENGINE_TIMEOUT_MARGIN))
+        self.idle = queue.Queue()
+        self.lock = threading.Lock()
+        self.name = engine_name
+        self.jobs = 0
+        self.timeouts = 0
+        self.kills = 0
+        self.restarts = 0
+        self.busy_waits = 0
+
+    def start(self):
+        # The first worker starts synchronously so configuration errors surface here
+        worker = _Worker(self.engine_name, self.engine_kwargs)
+        try:
+            worker.wait_ready(self.start_timeout)
+        except Exception:
+            worker.kill()
+            raise
+        self.name = worker.engine_name
+        self.idle.put(worker)
+        for _ in range(self.size - 1):
+            self._spawn_async(restart=False)
+
+    def _spawn_async(self, restart=True):
+        def spawn():
+            worker = _Worker(self.engine_name, self.engine_kwargs)
+            try:
+                worker.wait_ready(self.start_timeout)
+            except Exception:
+                worker.kill()
+                # keep trying in the background; the pool must not shrink for good
+                time.sleep(1)
+                self._spawn_async(restart)
+                return
+            with self.lock:
+                if restart:
+                    self.restarts += 1
+            self.idle.put(worker)
+        threading.Thread(target=spawn, name="ocr-spawn", daemon=True).start()
+
+    def idle_workers(self):
+        return self.idle.qsize()
+
+    def recognize(self, image, timeout=None):
+        return self._run("recognize", image, timeout)
+
+    def recognize_lines(self, image, timeout=None):
+        return self._run("recognize_lines", image, timeout)
+
+    def _run(self, method, image, timeout):
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            worker = self.idle.get(timeout=self.wait_timeout)
+        except queue.Empty:
+            with self.lock:
+                self.busy_waits += 1
+            raise OcrTimeout(f"no OCR worker free within {self.wait_timeout}s")
+        with self.lock:
+            self.jobs += 1
+        try:
+            worker.conn.send((method, image.mode, image.size, image.tobytes()))
+            if worker.conn.poll(timeout):
+                status, payload = worker.conn.recv()
+                self.idle.put(worker)
+                if status == "error":
+                    raise RuntimeError(payload)
+                return payload
+        except (EOFError, OSError, BrokenPipeError):
+            pass
+        else:
+            with self.lock:
+                self.timeouts += 1
+        # Timed out or the worker died: kill it and replace it off the hot path
+        worker.kill()
+        with self.lock:
+            self.kills += 1
+        self._spawn_async()
+        raise OcrTimeout(f"OCR job failed or exceeded {timeout}s; worker restarted")
+
+    def close(self):
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+            worker.kill()
+
+    def stats_text(self):
+        return (f"OCR workers ({self.name}): {self.jobs} jobs, {self.timeouts} timeouts, "
+                f"{self.kills} killed, {self.restarts} restarted, {self.busy_waits} gave up waiting for a free worker")
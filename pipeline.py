@@ -0,0 +1,271 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from PIL import Image
+
+from capture import copy_frame
+from chat_parser import ChatLine
+from language import DROP, KEEP
+from line_diff import LineDiffer
+from ocr import LineCache, ocr_strips
+from scroll import row_signatures, text_bands
+
+# === FAIR QUEUE ===
+
+class FairQueue:
+    # Inbox shared by several sources (chat regions). Each source keeps only its
+    # newest item and sources are served in arrival order, so a busy chat pane
+    # can't starve a quiet one and the queue never holds more than one item per
+    # source. A source is handed to one worker at a time until task_done(item).
+    def __init__(self, key=lambda item: item.source):
+        self.key = key
+        self.pending = OrderedDict()  # source -> newest item
+        self.busy = set()
+        self.cond = threading.Condition()
+        self.dropped = 0
+
+    def _ready(self):
+        return next((key for key in self.pending if key not in self.busy), None)
+
+    def put(self, item):
+        key = self.key(item)
+        with self.cond:
+            if key in self.pending:
+                self.dropped += 1  # replaced in place, keeping its turn
+            self.pending[key] = item
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        with self.cond:
+            if not self.cond.wait_for(lambda: self._ready() is not None, timeout):
+                return None
+            key = self._ready()
+            self.busy.add(key)
+            return self.pending.pop(key)
+
+    def task_done(self, item):
+        with self.cond:
+            self.busy.discard(self.key(item))
+            self.cond.notify_all()
+
+    def discard(self, key):
+        with self.cond:
+            self.pending.pop(key, None)
+
+    def clear(self):
+        with self.cond:
+            self.pending.clear()
+
+# === FRAMES & STAGES ===
+
+class Frame:
+    __slots__ = ("image", "source", "captured_at", "text", "translated")
+
+    def __init__(self, image, source=None):
+        self.image = image
+        self.source = source  # the chat region the frame was captured from
+        self.captured_at = time.perf_counter()
+        self.text = None
+        self.translated = None
+
+class Stage(threading.Thread):
+    # Worker that takes items from its inbox, runs handler(item) and forwards any
+    # non-None result to the outbox. A slow stage only delays itself.
+    def __init__(self, name, inbox, handler, outbox=None, on_error=None):
+        super().__init__(name=name, daemon=True)
+        self.inbox = inbox
+        self.handler = handler
+        self.outbox = outbox
+        self.on_error = on_error
+        self.processed = 0
+
+    def run(self):
+        while True:
+            item = self.inbox.get()
+            if item is None:
+                continue
+            try:
+                result = self.handler(item)
+                self.processed += 1
+                if result is not None and self.outbox is not None:
+                    self.outbox.put(result)
+            except Exception:
+                if self.on_error:
+                    self.on_error()
+            finally:
+                self.inbox.task_done(item)
+
+# === CHAT PIPELINE ===
+
+class PartialTranslation(Exception):
+    # Raised by translate_text when the translator failed: .text holds cached
+    # translations where there are some and the source line everywhere else
+    def __init__(self, text, error):
+        super().__init__(str(error))
+        self.text = text
+        self.error = error
+
+# The per-frame work shared by the overlay (main.py) and the offline tools in
+# benchmarks/: change detection → preprocessing → line OCR → cached per-line
+# translation. Status text, logging and Tk stay with the caller; errors raise.
+
+class ChatPipeline:
+    def __init__(self, recognize, translate_lines, change_detector=None, preprocessor=None,
+                 line_cache=None, translation_cache=None, src="ru", dest="en", line_differ=None, source=None, router=None,
+                 chat_parser=None, scroll_tracker=None, ocr_parallel=1, line_filter=None, idle_workers=None):
+        self.recognize = recognize
+        self.translate_lines = translate_lines
+        self.change_detector = change_detector
+        self.preprocessor = preprocessor
+        self.line_cache = line_cache if line_cache is not None else LineCache()
+        self.translation_cache = translation_cache
+        self.line_differ = line_differ if line_differ is not None else LineDiffer()
+        self.router = router  # language.LanguageRouter; None sends every line to the translator
+        self.chat_parser = chat_parser  # chat_parser.ChatParser; None translates whole lines, sender included
+        self.scroll_tracker = scroll_tracker  # scroll.ScrollTracker; None OCRs every changed frame in full
+        self.ocr_parallel = ocr_parallel  # max concurrent recognize calls for a full refresh (recognize must be thread-safe)
+        self.idle_workers = idle_workers  # e.g. OcrPool.idle_workers; extra strip groups only go to free workers
+        self.line_filter = line_filter  # ocr.LineFilter; recognize must then return OcrLines (recognize_lines)
+        self.src = src
+        self.dest = dest
+        self.source = source  # stamped on captured frames
+        self.cache_tag = None  # translation cache namespace of the active backend
+        self.last_hash = None
+        self.last_translated = None
+
+    def reset(self):
+        if self.change_detector:
+            self.change_detector.reset()
+
+    def forget(self):
+        # Drop everything remembered about earlier frames (e.g. after switching
+        # translator) so the next frame is OCR'd and translated from scratch
+        self.last_hash = None
+        self.last_translated = None
+        self.line_differ.reset()
+        if self.scroll_tracker:
+            self.scroll_tracker.reset()
+        self.reset()
+
+    def capture(self, image):
+        # None when the frame looks like the last OCR'd one. image may be a view
+        # into a capture source's reused buffer; only changed frames are copied.
+        if self.change_detector and not self.change_detector.changed(image):
+            return None
+        return Frame(copy_frame(image), self.source)
+
+    def ocr(self, frame):
+        # None when the frame has no text or the same text as last time
+        tracker = self.scroll_tracker
+        if tracker and isinstance(frame.image, np.ndarray):
+            text = self._ocr_scrolled(frame.image, tracker)
+        else:
+            text = "\n".join(text for text in self._ocr_rows(frame.image) if text)
+        if not text:
+            return None
+        text_hash = hashlib.md5(text.encode()).hexdigest()
+        if text_hash == self.last_hash:
+            return None
+        self.last_hash = text_hash
+        frame.text = text
+        return frame
+
+    def _ocr_rows(self, image, top=0):
+        # Text per text strip of image[top:], "" for strips with nothing (kept) to read
+        if top:
+            image = image[top:]
+        image = self.preprocessor.run(image) if self.preprocessor else image
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+        parallel = self.ocr_parallel
+        if parallel > 1 and self.idle_workers:
+            # Every group, this thread's included, needs a free pool worker; other
+            # regions may hold the rest of the pool
+            parallel = min(parallel, max(1, self.idle_workers()))
+        return [text.strip() for text in ocr_strips(image, self.recognize, self.line_cache, parallel, self.line_filter)]
+
+    def _ocr_scrolled(self, image, tracker):
+        # After a scroll (or a line added below) only the rows under the part
+        # that lines up with the previous frame are OCR'd. Line positions are
+        # known when OCR returned one line per text band; if not, the next
+        # frame gets a full pass.
+        signature, profile = row_signatures(image)
+        plan = tracker.plan(signature, profile)
+        band_top, kept = plan if plan else (0, [])
+        texts = self._ocr_rows(image, band_top) if band_top < len(signature) else []
+        bands = text_bands(profile, band_top)
+        lines = kept + [(top, bottom, text) for (top, bottom), text in zip(bands, texts)]
+        tracker.remember(signature, lines if len(bands) == len(texts) else None, plan is not None)
+        return "\n".join(text for text in [text for _, _, text in kept] + texts if text)
+
+    def _parse_and_route(self, text):
+        # [(line, ChatLine, route)] for the lines of text that aren't OCR noise
+        lines = text.splitlines()
+        if self.chat_parser:
+            parsed = self.chat_parser.parse_lines(lines)
+        else:
+            parsed = [ChatLine("", None, None, line) for line in lines]
+        routes = self.router.route([chat.body for chat in parsed], self.src, self.dest) if self.router else [None] * len(lines)
+        return [(line, chat, route) for line, chat, route in zip(lines, parsed, routes) if route != DROP]
+
+    def restore(self, text, translated):
+        # Line diff state as if translate_text(text) had just returned translated
+        # (batch.py --resume); the translation has one line per kept source line
+        lines = [line for line, _, _ in self._parse_and_route(text)]
+        translations = translated.splitlines()
+        if len(translations) == len(lines):
+            self.line_differ.remember(lines, translations)
+        else:
+            self.line_differ.reset()
+
+    def translate_text(self, text):
+        # Only message bodies are translated; the channel/sender header is put
+        # back in front. OCR noise is dropped and bodies already in the target
+        # language (or numbers) pass through. Lines that match a line of the
+        # previous frame (allowing for OCR jitter) keep its translation; of the
+        # rest, only bodies missing from the translation cache reach translate_lines
+        kept = self._parse_and_route(text)
+        lines = [line for line, _, _ in kept]
+        # Pass-through lines always show the current text, never an older line's
+        fixed = [route == KEEP or not chat.body.strip() for _, chat, route in kept]
+        results = self.line_differ.carry_over(lines, fixed)
+        cache = self.translation_cache
+        for i, (line, chat, route) in enumerate(kept):
+            if fixed[i]:
+                results[i] = line
+            elif results[i] is not None:
+                continue
+            elif cache is not None:
+                cached = cache.get(chat.body, self.src, self.dest, self.cache_tag)
+                if cached is not None:
+                    results[i] = chat.join(cached)
+        missing = list(dict.fromkeys(chat.body for (_, chat, _), result in zip(kept, results) if result is None))
+        if missing:
+            try:
+                fresh = dict(zip(missing, self.translate_lines(missing)))
+            except Exception as e:
+                # Forget this frame so the next scan tries the missing lines again
+                self.last_hash = None
+                self.last_translated = None
+                self.reset()
+                partial = [line if result is None else result for line, result in zip(lines, results)]
+                raise PartialTranslation("\n".join(partial), e) from e
+            if cache is not None:
+                for body, translated in fresh.items():
+                    cache.put(body, self.src, self.dest, translated, self.cache_tag)
+            results = [chat.join(fresh[chat.body]) if result is None else result
+                       for (_, chat, _), result in zip(kept, results)]
+        self.line_differ.remember(lines, results)
+        return "\n".join(results)
+
+    def translate(self, frame):
+        # None when only OCR noise changed, so the overlay isn't redrawn
+        translated = self.translate_text(frame.text)
+        if not translated or translated == self.last_translated:
+            return None
+        self.last_translated = translated
+        frame.translated = translated
+        return frame
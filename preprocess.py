@@ -0,0 +1,129 @@
+import time
+from collections import deque
+
+import numpy as np
+from PIL import Image
+
+# === IMAGE PREPROCESSING ===
+# Runs between capture and OCR. Each step is a NumPy array operation; the
+# result is dark text on a white background, cropped and scaled up, which is
+# what Tesseract reads fastest and most reliably. Steps and their parameters
+# are configured as a list of (name, params) tuples.
+
+# Approximate L2 chat channel colours (RGB); tune per client/theme
+CHAT_COLORS = {
+    "general": (220, 220, 220),
+    "shout": (255, 112, 0),
+    "trade": (234, 165, 245),
+    "party": (0, 255, 0),
+    "clan": (125, 119, 255),
+    "alliance": (119, 255, 153),
+    "whisper": (255, 0, 255),
+    "hero": (0, 204, 255),
+}
+
+DEFAULT_STEPS = [
+    ("grayscale", {}),
+    ("threshold", {}),
+    ("trim", {"margin": 4}),
+    ("upscale", {"factor": 2}),
+]
+
+def grayscale(arr):
+    if arr.ndim == 2:
+        return arr
+    rgb = arr[..., :3].astype(np.uint16)
+    # Integer BT.601 luma: (77 R + 150 G + 29 B) / 256
+    return ((rgb[..., 0] * 77 + rgb[..., 1] * 150 + rgb[..., 2] * 29) >> 8).astype(np.uint8)
+
+def otsu_level(gray):
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    levels = np.arange(256)
+    weight_bg = np.cumsum(hist)
+    weight_fg = weight_bg[-1] - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = sum_bg / np.maximum(weight_bg, 1)
+    mean_fg = (sum_bg[-1] - sum_bg) / np.maximum(weight_fg, 1)
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between))
+
+def threshold(arr, level=None):
+    # L2 chat text is brighter than its background: bright pixels become black ink
+    gray = grayscale(arr)
+    if level is None:
+        level = otsu_level(gray)
+    return np.where(gray > level, 0, 255).astype(np.uint8)
+
+def color_mask(arr, channels=None, tolerance=40):
+    # Keeps only pixels close to one of the chat channel colours (per-channel
+    # distance <= tolerance) and renders them as black ink on white
+    if arr.ndim == 2:
+        return arr
+    rgb = arr[..., :3].astype(np.int16)
+    ink = np.zeros(rgb.shape[:2], dtype=bool)
+    for name in (channels or CHAT_COLORS):
+        color = np.array(CHAT_COLORS[name], dtype=np.int16)
+        ink |= (np.abs(rgb - color).max(axis=2) <= tolerance)
+    return np.where(ink, 0, 255).astype(np.uint8)
+
+def trim(arr, margin=4, sides="tbl"):
+    # Crops empty margins around the ink. The right edge is kept by default so
+    # strip widths (and the OCR line cache keys) stay stable as lines scroll.
+    ink = arr < 128 if arr.ndim == 2 else grayscale(arr) < 128
+    rows = np.flatnonzero(ink.any(axis=1))
+    if rows.size == 0:
+        return arr
+    cols = np.flatnonzero(ink.any(axis=0))
+    h, w = ink.shape
+    top = max(0, rows[0] - margin) if "t" in sides else 0
+    bottom = min(h, rows[-1] + 1 + margin) if "b" in sides else h
+    left = max(0, cols[0] - margin) if "l" in sides else 0
+    right = min(w, cols[-1] + 1 + margin) if "r" in sides else w
+    return arr[top:bottom, left:right]
+
+def upscale(arr, factor=2):
+    if factor <= 1:
+        return arr
+    return np.repeat(np.repeat(arr, factor, axis=0), factor, axis=1)
+
+def with_scale(steps, factor):
+    # The same steps with the upscale factor replaced (or an upscale step added)
+    steps = [(name, dict(params, factor=factor) if name == "upscale" else params) for name, params in steps]
+    if factor > 1 and not any(name == "upscale" for name, _ in steps):
+        steps.append(("upscale", {"factor": factor}))
+    return steps
+
+PREPROCESS_STEPS = {
+    "grayscale": grayscale,
+    "threshold": threshold,
+    "color_mask": color_mask,
+    "trim": trim,
+    "upscale": upscale,
+}
+
+class Preprocessor:
+    def __init__(self, steps=None, window=100):
+        steps = DEFAULT_STEPS if steps is None else steps
+        for name, _ in steps:
+            if name not in PREPROCESS_STEPS:
+                raise ValueError(f"Unknown preprocessing step: {name}")
+        self.steps = list(steps)
+        self.timings = {name: deque(maxlen=window) for name, _ in self.steps}
+
+    def run(self, image):
+        if not self.steps:
+            return image
+        arr = np.asarray(image)
+        for name, params in self.steps:
+            t0 = time.perf_counter()
+            arr = PREPROCESS_STEPS[name](arr, **params)
+            self.timings[name].append(time.perf_counter() - t0)
+        return Image.fromarray(np.ascontiguousarray(arr))
+
+    def stats_text(self):
+        parts = []
+        for name, _ in self.steps:
+            samples = self.timings[name]
+            if samples:
+                parts.append(f"{name} {sum(samples) / len(samples) * 1000:.2f} ms")
+        return "Preprocessing: " + (", ".join(parts) if parts else "no frames yet")
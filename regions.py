@@ -0,0 +1,81 @@
+# === CHAT REGIONS ===
+# One watched chat pane (general, trade, clan, ...). Every region has its own
+# capture box, change detection, scan schedule and pipeline state (last text,
+# line diff), plus its own overlay windows, which main.py creates and stores
+# here. OCR workers, the line/translation caches and the translator are shared.
+
+class RenderState:
+    # What was last applied to a region's Tk windows, keyed like "overlay.text",
+    # so a redraw only touches properties whose value actually changed
+    def __init__(self):
+        self.applied = {}
+        self.ops = 0
+        self.skipped = 0
+
+    def changed(self, key, value):
+        if key in self.applied and self.applied[key] == value:
+            self.skipped += 1
+            return False
+        self.applied[key] = value
+        self.ops += 1
+        return True
+
+    def get(self, key, default=None):
+        return self.applied.get(key, default)
+
+    def forget(self, prefix=""):
+        # After a window was (re)created nothing about it is known any more
+        for key in [key for key in self.applied if key.startswith(prefix)]:
+            del self.applied[key]
+
+class ChatRegion:
+    def __init__(self, name, bbox, pipeline, scheduler, probe_detector):
+        self.name = name
+        self.bbox = bbox  # (x1, y1, x2, y2) in screen pixels
+        self.pipeline = pipeline
+        self.scheduler = scheduler
+        self.probe_detector = probe_detector
+        self.capture_source = None  # capture.CaptureSource for the region...
+        self.probe_source = None    # ...and one for the adaptive-scan probe strip
+        self.active = True  # cleared on removal; its capture thread then exits
+        self.capture_thread = None
+        # Tk state, owned by main.py
+        self.render = RenderState()
+        self.overlay_window = None
+        self.overlay_label = None
+        self.overlay_hwnd = None
+        self.overlay_position = None  # (x, y) if the user moved the overlay, None = stick to region
+        self.header_window = None
+        self.header_name_label = None
+        self.status_label = None
+        self.border_window = None
+        self.border_canvas = None
+        self.border_rect = None
+        self.move_mode = False
+        self.drag_timer = None
+        self.busy_anim_running = False
+        self.busy_anim_dots = 0
+
+    @property
+    def change_detector(self):
+        return self.pipeline.change_detector
+
+    def stats_text(self):
+        detector = self.change_detector
+        lines = [f"[{self.name}] {detector.frames_seen} frames, {detector.frames_skipped} unchanged; "
+                 f"{self.pipeline.line_differ.stats_text()}",
+                 f"[{self.name}] {self.scheduler.stats_text()}"]
+        if self.pipeline.scroll_tracker:
+            lines.append(f"[{self.name}] {self.pipeline.scroll_tracker.stats_text()}")
+        if self.capture_source:
+            lines.append(f"[{self.name}] {self.capture_source.stats_text()}")
+        return "\n".join(lines)
+
+def unique_region_name(name, regions):
+    taken = {region.name for region in regions}
+    if name not in taken:
+        return name
+    n = 2
+    while f"{name} {n}" in taken:
+        n += 1
+    return f"{name} {n}"
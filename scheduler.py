@@ -0,0 +1,69 @@
+import threading
+import time
+
+# === SCAN SCHEDULER ===
+# Decides how long the capture stage sleeps between scans. In adaptive mode it
+# polls at min_interval while the chat is changing and backs off exponentially
+# towards max_interval while it is idle. wake() or a cheap probe callback cut a
+# wait short, so a new message doesn't have to wait out a long idle interval.
+
+PROBE_INTERVAL = 0.25  # seconds between probe calls during an adaptive wait
+
+class ScanScheduler:
+    def __init__(self, min_interval=0.5, max_interval=10.0, backoff=1.6):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.adaptive = False
+        self.fixed_interval = 5.0
+        self.interval = min_interval
+        self.wake_event = threading.Event()
+        self.wakeups = 0
+
+    def set_fixed(self, interval):
+        self.adaptive = False
+        self.fixed_interval = interval
+        self.wake()
+
+    def set_adaptive(self, min_interval=None, max_interval=None):
+        self.adaptive = True
+        if min_interval is not None:
+            self.min_interval = min_interval
+        if max_interval is not None:
+            self.max_interval = max_interval
+        self.interval = self.min_interval
+        self.wake()
+
+    def record(self, changed):
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+
+    def current_interval(self):
+        return self.interval if self.adaptive else self.fixed_interval
+
+    def wake(self):
+        self.wake_event.set()
+
+    def wait(self, probe=None):
+        # Returns True when the wait was cut short by wake() or the probe
+        deadline = time.monotonic() + self.current_interval()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            step = min(remaining, PROBE_INTERVAL) if (probe and self.adaptive) else remaining
+            if self.wake_event.wait(step):
+                self.wake_event.clear()
+                self.wakeups += 1
+                return True
+            if probe and self.adaptive and probe():
+                self.interval = self.min_interval
+                self.wakeups += 1
+                return True
+
+    def stats_text(self):
+        interval = self.current_interval()
+        mode = f"adaptive {self.min_interval:g}–{self.max_interval:g}s" if self.adaptive else "fixed"
+        return f"Scan: {mode}, every {interval:.2f}s ({1 / interval:.2f} scans/s), {self.wakeups} early wake-ups"
@@ -0,0 +1,117 @@
+import numpy as np
+
+from ocr import INK_DELTA, LINE_PADDING, MIN_LINE_HEIGHT, MIN_ROW_INK
+from preprocess import grayscale
+
+# === SCROLL ESTIMATION ===
+# When a chat message arrives, the pane is the previous frame moved up by k
+# pixels (k = 0 while the pane is still filling) with new text below. Each row
+# of a frame is reduced to a short signature (share of ink in a few column
+# bins); for every candidate k the previous rows are laid over the current
+# ones and the rows that line up from the top are counted. The k with the
+# longest match gives the shift, and only the rows below the match need OCR:
+# the previous lines above it are moved up with it. Anything else (no match,
+# resized region, lines whose position isn't known) gets a full pass.
+
+SIGNATURE_BINS = 64       # column bins per row signature
+MAX_SCROLL_RATIO = 0.6    # a larger shift exposes most of the pane, so a full pass is as cheap
+MAX_ROW_ERROR = 0.02      # mean signature difference at which two rows still match (background shimmer)
+MIN_MATCH_INK_ROWS = 8    # the matched rows must hold some text, or blank rows would match any shift
+
+def row_signatures(arr):
+    # (rows x SIGNATURE_BINS) float32 share of ink, plus the per-row ink profile
+    # (0-255, like ocr.segment_lines) used to find text lines
+    gray = grayscale(arr).astype(np.int16)
+    ink = np.abs(gray - int(np.median(gray))) > INK_DELTA
+    h, w = ink.shape
+    bins = min(SIGNATURE_BINS, w)
+    step = w // bins
+    signature = ink[:, :bins * step].reshape(h, bins, step).mean(axis=2, dtype=np.float32)
+    profile = ink.mean(axis=1) * 255
+    return signature, profile
+
+def text_bands(profile, start=0):
+    # (top, bottom) rows of text lines in profile[start:], in frame coordinates
+    bands = []
+    top = None
+    h = len(profile)
+    for y in range(start, h + 1):
+        inked = y < h and profile[y] >= MIN_ROW_INK
+        if inked and top is None:
+            top = y
+        elif not inked and top is not None:
+            if y - top >= MIN_LINE_HEIGHT:
+                bands.append((max(start, top - LINE_PADDING), min(h, y + LINE_PADDING)))
+            top = None
+    return bands
+
+def estimate_shift(previous, current, profile, max_shift):
+    # (upward shift in rows, rows from the top that match the shifted previous
+    # frame), or None when no shift lines up enough text
+    h = len(current)
+    if len(previous) != h:
+        return None
+    inked = profile >= MIN_ROW_INK
+    best = None
+    for k in range(0, min(max_shift, h - 1) + 1):
+        if best and h - k <= best[1]:
+            break  # no larger shift can match more rows
+        errors = np.abs(previous[k:] - current[:h - k]).mean(axis=1)
+        mismatched = np.flatnonzero(errors > MAX_ROW_ERROR)
+        matched = int(mismatched[0]) if mismatched.size else h - k
+        if inked[:matched].sum() >= MIN_MATCH_INK_ROWS and (best is None or matched > best[1]):
+            best = (k, matched)
+    return best
+
+class ScrollTracker:
+    # One per chat region, used by its OCR worker only
+    def __init__(self, max_scroll_ratio=MAX_SCROLL_RATIO):
+        self.max_scroll_ratio = max_scroll_ratio
+        self.signature = None
+        self.lines = None  # [(top, bottom, text)] of the last OCR'd frame, None if unknown
+        self.band_passes = 0
+        self.full_passes = 0
+        self.rows_skipped = 0
+        self.rows_total = 0
+
+    def reset(self):
+        self.signature = None
+        self.lines = None
+
+    def plan(self, signature, profile):
+        # (band top, previous lines moved up) when only rows band top.. need OCR, else None
+        previous, lines = self.signature, self.lines
+        h = len(signature)
+        self.rows_total += h
+        if previous is None or lines is None:
+            return None
+        shift = estimate_shift(previous, signature, profile, int(h * self.max_scroll_ratio))
+        if shift is None:
+            return None
+        k, band_top = shift
+        kept = []
+        for top, bottom, text in lines:
+            top, bottom = top - k, bottom - k
+            if top < -LINE_PADDING:
+                continue  # scrolled (partly) out of view
+            if top >= band_top:
+                break
+            kept.append((max(0, top), bottom, text))
+        # A line reaching into the changed rows is read again in full
+        while kept and kept[-1][1] > band_top + LINE_PADDING:
+            band_top = min(band_top, kept.pop()[0])
+        self.rows_skipped += band_top
+        return band_top, kept
+
+    def remember(self, signature, lines, band):
+        self.signature = signature
+        self.lines = lines
+        if band:
+            self.band_passes += 1
+        else:
+            self.full_passes += 1
+
+    def stats_text(self):
+        skipped_pct = 100.0 * self.rows_skipped / self.rows_total if self.rows_total else 0.0
+        return (f"Scroll: {self.band_passes} band-only OCR passes, {self.full_passes} full passes "
+                f"({skipped_pct:.0f}% of rows not re-read)")
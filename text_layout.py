@@ -0,0 +1,110 @@
+import tkinter.font as tkfont
+from collections import OrderedDict
+
+# === TEXT CLEANUP ===
+
+def sanitize_text(text):
+    lines = [line.rstrip() for line in text.strip().splitlines()]
+    new_lines = []
+    prev_blank = False
+    for line in lines:
+        if line.strip() == "":
+            if not prev_blank:
+                new_lines.append("")
+            prev_blank = True
+        else:
+            new_lines.append(line)
+            prev_blank = False
+    return "\n".join(new_lines).replace("\n\n","\n").replace("\n\n","\n")
+
+# === TEXT LAYOUT ===
+# Measures wrapped text with tkinter.font.Font instead of building throwaway
+# Tk interpreters and Label widgets. Wrapping mimics a tk.Label with
+# wraplength set (greedy word wrap, over-long words broken by character).
+
+LABEL_PADDING = 6  # a default tk.Label adds 2px border + 1px pad on each side
+
+class TextLayout:
+    def __init__(self, root, family="Arial", cache_size=256):
+        self.root = root
+        self.family = family
+        self.cache_size = cache_size
+        self.fonts = {}
+        self.word_widths = {}
+        self.cache = OrderedDict()
+
+    def _font(self, size):
+        font = self.fonts.get(size)
+        if font is None:
+            font = tkfont.Font(root=self.root, family=self.family, size=size)
+            self.fonts[size] = font
+            self.word_widths[size] = {}
+        return font
+
+    def _width(self, size, chunk):
+        widths = self.word_widths[size]
+        width = widths.get(chunk)
+        if width is None:
+            width = self.fonts[size].measure(chunk)
+            if len(widths) < 20000:
+                widths[chunk] = width
+        return width
+
+    def _wrap_paragraph(self, size, paragraph, wraplength):
+        # Returns (line count, widest line) for one paragraph
+        space = self._width(size, " ")
+        lines, widest, current = 1, 0, 0
+        for word in paragraph.split(" "):
+            width = self._width(size, word)
+            if current and current + space + width > wraplength:
+                widest = max(widest, current)
+                lines += 1
+                current = 0
+            elif current:
+                current += space
+            if width > wraplength:
+                # Break an over-long word across lines by character
+                for char in word:
+                    char_width = self._width(size, char)
+                    if current and current + char_width > wraplength:
+                        widest = max(widest, current)
+                        lines += 1
+                        current = 0
+                    current += char_width
+            else:
+                current += width
+        return lines, max(widest, current)
+
+    def text_size(self, text, size, wraplength=None):
+        font = self._font(size)
+        lines, widest = 0, 0
+        for paragraph in text.split("\n"):
+            if wraplength and wraplength > 0:
+                count, width = self._wrap_paragraph(size, paragraph, wraplength)
+            else:
+                count, width = 1, self._width(size, paragraph)
+            lines += count
+            widest = max(widest, width)
+        height = lines * font.metrics("linespace")
+        return widest + LABEL_PADDING, height + LABEL_PADDING
+
+    def fitting_size(self, text, width, height, min_size=8, max_size=32):
+        key = (text, width, height, self.family, min_size, max_size)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+        # Binary search for the largest size that fits; text size grows with font size
+        best = min_size
+        low, high = min_size, max_size
+        while low <= high:
+            mid = (low + high) // 2
+            req_width, req_height = self.text_size(text, mid, width)
+            if req_width <= width and req_height <= height:
+                best = mid
+                low = mid + 1
+            else:
+                high = mid - 1
+        self.cache[key] = best
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return best
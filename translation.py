@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import urllib.request
+
+# === TRANSLATION BACKENDS ===
+# Every backend turns a list of source lines into a list of translated lines
+# of the same length. start() does the slow setup (model loading, file
+# parsing) once; translate_lines() raises on failure.
+
+class TranslationBackend:
+    name = "base"
+    label = "Base"
+    online = False
+
+    def __init__(self, src="ru", dest="en", **options):
+        self.src = src
+        self.dest = dest
+        self.options = options
+
+    def start(self):
+        pass
+
+    def translate_lines(self, lines):
+        raise NotImplementedError
+
+class GoogleBackend(TranslationBackend):
+    name = "google"
+    label = "Google (online)"
+    online = True
+
+    def start(self):
+        from googletrans import Translator
+        self.translator = Translator()
+
+    def translate_lines(self, lines):
+        # One request for all lines; googletrans keeps line breaks, but if the line
+        # count comes back different we translate line by line to keep the mapping.
+        result = self.translator.translate("\n".join(lines), src=self.src, dest=self.dest)
+        translated = result.text.splitlines()
+        if len(translated) != len(lines):
+            translated = [self.translator.translate(line, src=self.src, dest=self.dest).text for line in lines]
+        return translated
+
+class ArgosBackend(TranslationBackend):
+    # Fully offline neural MT (pip install argostranslate, plus the ru→en package)
+    name = "argos"
+    label = "Offline model (Argos)"
+
+    def start(self):
+        from argostranslate import translate as argos
+        languages = {lang.code: lang for lang in argos.get_installed_languages()}
+        if self.src not in languages or self.dest not in languages:
+            raise RuntimeError(f"Argos language package {self.src}→{self.dest} is not installed")
+        self.translation = languages[self.src].get_translation(languages[self.dest])
+        if self.translation is None:
+            raise RuntimeError(f"Argos has no {self.src}→{self.dest} model installed")
+        self.lock = threading.Lock()
+
+    def translate_lines(self, lines):
+        with self.lock:
+            return [self.translation.translate(line) for line in lines]
+
+class PhraseTableBackend(TranslationBackend):
+    # Offline lookup table: one "source<TAB>translation" pair per line in a
+    # UTF-8 file. Whole lines are matched first, then the longest known word
+    # sequences; unknown words pass through untranslated.
+    name = "phrases"
+    label = "Offline phrase table"
+    MAX_PHRASE_WORDS = 6
+
+    def start(self):
+        path = self.options.get("phrase_table")
+        if not path or not os.path.exists(path):
+            raise RuntimeError(f"Phrase table not found: {path}")
+        self.phrases = {}
+        with open(path, encoding="utf-8") as f:
+            for row in f:
+                if "\t" not in row or row.startswith("#"):
+                    continue
+                source, translated = row.rstrip("\n").split("\t", 1)
+                self.phrases[" ".join(source.lower().split())] = translated.strip()
+
+    def _translate_line(self, line):
+        words = line.split()
+        whole = " ".join(words).lower()
+        if whole in self.phrases:
+            return self.phrases[whole]
+        out = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.MAX_PHRASE_WORDS, len(words) - i), 0, -1):
+                key = " ".join(words[i:i + n]).lower().strip(".,!?:;")
+                if key in self.phrases:
+                    out.append(self.phrases[key])
+                    i += n
+                    break
+            else:
+                out.append(words[i])
+                i += 1
+        return " ".join(out)
+
+    def translate_lines(self, lines):
+        return [self._translate_line(line) for line in lines]
+
+class HttpBackend(TranslationBackend):
+    # LibreTranslate-compatible API, e.g. a local server on http://127.0.0.1:5000
+    name = "http"
+    label = "Local HTTP server"
+
+    def start(self):
+        self.url = self.options.get("url", "http://127.0.0.1:5000").rstrip("/") + "/translate"
+        self.timeout = self.options.get("timeout", 10)
+        self.api_key = self.options.get("api_key")
+
+    def translate_lines(self, lines):
+        payload = {"q": lines, "source": self.src, "target": self.dest, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        request = urllib.request.Request(
+            self.url, data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.loads(response.read().decode("utf-8"))
+        translated = body.get("translatedText")
+        if isinstance(translated, str):
+            translated = translated.split("\n")
+        if not isinstance(translated, list) or len(translated) != len(lines):
+            raise RuntimeError(f"Unexpected response from {self.url}: {body}")
+        return translated
+
+TRANSLATION_BACKENDS = {backend.name: backend for backend in (GoogleBackend, ArgosBackend, PhraseTableBackend, HttpBackend)}
+
+def create_backend(name, src="ru", dest="en", **options):
+    if name not in TRANSLATION_BACKENDS:
+        raise ValueError(f"Unknown translation backend: {name}")
+    backend = TRANSLATION_BACKENDS[name](src, dest, **options)
+    backend.start()
+    return backend
@@ -0,0 +1,118 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# === TRANSLATION CACHE ===
+# Line-level cache keyed by (normalized source line, language pair). Recently
+# used entries live in a bounded in-memory LRU; everything is persisted to a
+# small sqlite file so recurring spam (trade shouts, clan recruitment) is warm
+# on the next start. New entries are written in batches by flush().
+
+MEMORY_CAPACITY = 4096
+DISK_CAPACITY = 100000
+FLUSH_INTERVAL = 30  # seconds
+
+def normalize_line(line):
+    return " ".join(line.split())
+
+def pair_key(src, dest, backend=None):
+    # Non-default backends get their own namespace so switching back to Google
+    # doesn't serve, say, phrase-table output
+    return f"{src}>{dest}/{backend}" if backend else f"{src}>{dest}"
+
+class TranslationCache:
+    def __init__(self, path, capacity=MEMORY_CAPACITY, disk_capacity=DISK_CAPACITY, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.capacity = capacity
+        self.disk_capacity = disk_capacity
+        self.flush_interval = flush_interval
+        self.entries = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.db = None
+        self.last_flush = time.monotonic()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        with self.lock:
+            self.db = sqlite3.connect(self.path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "pair TEXT NOT NULL, source TEXT NOT NULL, translated TEXT NOT NULL, used REAL NOT NULL, "
+                "PRIMARY KEY (pair, source))"
+            )
+            self.db.commit()
+            rows = self.db.execute(
+                "SELECT pair, source, translated FROM translations ORDER BY used DESC LIMIT ?",
+                (self.capacity,)
+            ).fetchall()
+            for pair, source, translated in reversed(rows):
+                self.entries[(pair, source)] = translated
+            return len(rows)
+
+    def get(self, line, src, dest, backend=None):
+        key = (pair_key(src, dest, backend), normalize_line(line))
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            translated = None
+            if self.db is not None:
+                row = self.db.execute(
+                    "SELECT translated FROM translations WHERE pair = ? AND source = ?", key
+                ).fetchone()
+                if row:
+                    translated = row[0]
+            if translated is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, translated)
+            return translated
+
+    def put(self, line, src, dest, translated, backend=None):
+        key = (pair_key(src, dest, backend), normalize_line(line))
+        with self.lock:
+            self._remember(key, translated)
+
+    def _remember(self, key, translated):
+        self.entries[key] = translated
+        self.entries.move_to_end(key)
+        self.pending[key] = (translated, time.time())
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if self.db is None or not self.pending:
+                return
+            rows = [(pair, source, translated, used) for (pair, source), (translated, used) in self.pending.items()]
+            self.pending.clear()
+            self.db.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?)", rows)
+            self.db.execute(
+                "DELETE FROM translations WHERE rowid NOT IN "
+                "(SELECT rowid FROM translations ORDER BY used DESC LIMIT ?)",
+                (self.disk_capacity,)
+            )
+            self.db.commit()
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
+
+    def stats_text(self):
+        total = self.hits + self.misses
+        hit_pct = 100.0 * self.hits / total if total else 0.0
+        return (f"Translation cache: {self.hits} hits / {self.misses} misses ({hit_pct:.1f}% not sent)\n"
+                f"Translation cache size: {len(self.entries)} in memory")
@@ -0,0 +1,146 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# === TRANSLATION CLIENT ===
+# Sits between ChatPipeline and a translation backend. Lines are grouped
+# into batches (one request each), a few batches may be in flight at once,
+# requests are paced by a token bucket, failures are retried with jittered
+# exponential backoff, and a circuit breaker stops calling a backend that
+# keeps failing until reset_timeout has passed.
+
+class CircuitOpen(Exception):
+    pass
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        # Blocks until a token is available; returns the seconds spent waiting
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.opens = 0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self):
+        # In half-open state requests go through as probes; one success closes it
+        return self.state != "open"
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    self.opens += 1
+                self.opened_at = time.monotonic()
+
+class TranslationClient:
+    def __init__(self, translate_lines, max_batch_lines=20, max_batch_chars=3000, concurrency=2,
+                 rate=None, burst=3, retries=3, backoff=0.5, failure_threshold=5, reset_timeout=30):
+        self.backend_translate = translate_lines
+        self.max_batch_lines = max_batch_lines
+        self.max_batch_chars = max_batch_chars
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="translate")
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retried = 0
+        self.failed = 0
+        self.rejected = 0
+        self.throttled_seconds = 0.0
+
+    def _batches(self, lines):
+        batch, chars = [], 0
+        for line in lines:
+            if batch and (len(batch) >= self.max_batch_lines or chars + len(line) > self.max_batch_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(line)
+            chars += len(line) + 1
+        if batch:
+            yield batch
+
+    def _send(self, batch):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                with self.lock:
+                    self.rejected += 1
+                raise CircuitOpen(f"translator paused after repeated failures (retry in {self.breaker.reset_timeout}s)")
+            if self.bucket:
+                waited = self.bucket.acquire()
+                with self.lock:
+                    self.throttled_seconds += waited
+            with self.lock:
+                self.requests += 1
+            try:
+                result = self.backend_translate(batch)
+                self.breaker.record_success()
+                return result
+            except Exception:
+                self.breaker.record_failure()
+                attempt += 1
+                if attempt > self.retries:
+                    with self.lock:
+                        self.failed += 1
+                    raise
+                with self.lock:
+                    self.retried += 1
+                # Full jitter: sleep a random amount up to the exponential step
+                time.sleep(random.uniform(0, self.backoff * (2 ** (attempt - 1))))
+
+    def translate_lines(self, lines):
+        batches = list(self._batches(lines))
+        if len(batches) == 1:
+            return self._send(batches[0])
+        results = []
+        for future in [self.executor.submit(self._send, batch) for batch in batches]:
+            results.extend(future.result())
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+    def stats_text(self):
+        return (f"Translator: {self.requests} requests, {self.retried} retries, {self.failed} failed, "
+                f"breaker {self.breaker.state} (opened {self.breaker.opens}x, {self.rejected} rejected), "
+                f"{self.throttled_seconds:.1f}s rate-limited")